@@ -7,45 +7,193 @@ showing the number of lines in each file.
 """
 
 import argparse
+import json
 import logging
-from datetime import datetime
+import mmap
+import os
+import shutil
+import subprocess
+import sys
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 
+import matplotlib
+
+# Render off-screen unless a backend is explicitly requested via MPLBACKEND
+if "MPLBACKEND" not in os.environ:
+    matplotlib.use("Agg")
+
 import matplotlib.dates as mdates
 import matplotlib.pyplot as plt
+import numpy as np
 import pandas as pd
 
+# Size of the slices scanned at once when counting newlines in a mapped file
+MMAP_CHUNK_SIZE = 1 << 24
+
+# Block size for reading files that cannot be memory-mapped
+READ_CHUNK_SIZE = 1 << 20
+
+# Maximum number of files passed to a single grep invocation
+GREP_BATCH_SIZE = 1000
+
+# Cache of line counts per file, stored in the output directory between runs
+LINE_COUNT_CACHE_FILENAME = ".line_count_cache.json"
+
+# Fields of each cache entry
+LINE_COUNT_CACHE_KEYS = ("size", "mtime_ns", "line_count")
+
+# Filename format: results_YYYYMMDD_HHMMSS_hash.csv (captures the date part)
+RESULTS_FILENAME_PATTERN = r"^results_(\d{8})_.*\.csv$"
+
 
 def get_csv_files(input_dir):
     """Get all CSV files from the results directory."""
-    results_path = Path(input_dir)
-    return list(results_path.glob("*.csv"))
+    with os.scandir(input_dir) as entries:
+        return [
+            entry.path
+            for entry in entries
+            if entry.name.endswith(".csv") and entry.is_file()
+        ]
 
 
 def count_lines_in_csv(file_path):
-    """Count the number of lines in a CSV file."""
+    """Count the number of lines in a CSV file (None if it cannot be read).
+
+    The file is memory-mapped and newlines are counted in bulk with
+    ``bytes.count`` instead of decoding and iterating it line by line.
+    """
     try:
-        with open(file_path, "r", encoding="utf-8") as f:
-            return sum(1 for line in f)
+        with open(file_path, "rb", buffering=0) as f:
+            try:
+                mm = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            except (OSError, ValueError):
+                # Empty or unmappable files are read in large binary blocks
+                return count_lines_in_stream(f)
+            with mm:
+                count = 0
+                for start in range(0, len(mm), MMAP_CHUNK_SIZE):
+                    count += mm[start : start + MMAP_CHUNK_SIZE].count(b"\n")
+                # A last line without a trailing newline still counts as a line
+                if mm[-1:] != b"\n":
+                    count += 1
+                return count
     except Exception as e:
-        logging.error(f"Error reading {file_path}: {e}")
-        return 0
-
-
-def extract_date_from_filename(filename):
-    """Extract date from filename format: results_YYYYMMDD_HHMMSS_hash.csv"""
-    basename = Path(filename).name
-    if basename.startswith("results_") and basename.endswith(".csv"):
-        try:
-            # Extract date part: YYYYMMDD
-            date_part = basename.split("_")[1]
-            return datetime.strptime(date_part, "%Y%m%d")
-        except (IndexError, ValueError):
+        logging.error("Error reading %s: %s", file_path, e)
+        return None
+
+
+def count_lines_in_stream(f):
+    """Count the number of lines in a binary stream using large block reads."""
+    count = 0
+    last = b"\n"
+    while True:
+        buf = f.read(READ_CHUNK_SIZE)
+        if not buf:
+            break
+        count += buf.count(b"\n")
+        last = buf[-1:]
+    # A last line without a trailing newline still counts as a line
+    if last != b"\n":
+        count += 1
+    return count
+
+
+def count_lines_with_grep(file_paths):
+    """Count lines of many files with batched ``grep -c`` invocations.
+
+    Returns a dict of path -> line count, or None if grep is unavailable.
+    Files grep could not read are missing from the result.
+    """
+    grep = shutil.which("grep")
+    if grep is None:
+        return None
+
+    counts = {}
+    for start in range(0, len(file_paths), GREP_BATCH_SIZE):
+        batch = [str(p) for p in file_paths[start : start + GREP_BATCH_SIZE]]
+        # -a: treat as text, -c: count matching lines, -H: always print the name
+        result = subprocess.run(
+            [grep, "-acH", "", "--", *batch], capture_output=True, text=True
+        )
+        # grep exits with 1 when no line matched (all files empty)
+        if result.returncode > 1 and not result.stdout:
+            logging.warning("grep failed: %s", result.stderr.strip())
             return None
-    return None
+        for line in result.stdout.splitlines():
+            path, _, count = line.rpartition(":")
+            counts[path] = int(count)
+    return counts
+
+
+def count_lines_in_csv_files(file_paths):
+    """Count the number of lines in each of the given CSV files.
+
+    All files are counted with batched grep calls when available; any file
+    grep could not handle is counted with count_lines_in_csv on a thread pool.
+    Files that could not be read at all are counted as None.
+    """
+    counts = count_lines_with_grep(file_paths) or {}
+    line_counts = [counts.get(str(p)) for p in file_paths]
+
+    remaining = [i for i, count in enumerate(line_counts) if count is None]
+    if remaining:
+        max_workers = min(32, (os.cpu_count() or 1) * 4)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            fallback_counts = executor.map(
+                count_lines_in_csv, [file_paths[i] for i in remaining]
+            )
+            for i, line_count in zip(remaining, fallback_counts):
+                line_counts[i] = line_count
+    return line_counts
+
+
+def load_line_count_cache(cache_path):
+    """Load cached line counts keyed by filename.
+
+    Entries that are not {"size", "mtime_ns", "line_count"} integer records
+    are dropped, so they are counted again like stale ones.
+    """
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cache = json.load(f)
+    except FileNotFoundError:
+        return {}
+    except (OSError, ValueError) as e:
+        logging.warning("Ignoring unreadable line count cache %s: %s", cache_path, e)
+        return {}
+
+    if not isinstance(cache, dict):
+        logging.warning("Ignoring malformed line count cache %s", cache_path)
+        return {}
+    return {
+        name: entry
+        for name, entry in cache.items()
+        if isinstance(entry, dict)
+        and all(type(entry.get(key)) is int for key in LINE_COUNT_CACHE_KEYS)
+    }
+
+
+def save_line_count_cache(cache_path, cache):
+    """Save line counts keyed by filename."""
+    try:
+        with open(cache_path, "w", encoding="utf-8") as f:
+            json.dump(cache, f)
+    except OSError as e:
+        logging.warning("Failed to write line count cache %s: %s", cache_path, e)
 
 
-def analyze_csv_files(input_dir, output_dir):
+def extract_dates_from_filenames(filenames):
+    """Extract dates from a batch of filenames in one vectorized pass.
+
+    Filenames that do not match results_YYYYMMDD_HHMMSS_hash.csv yield NaT.
+    """
+    names = pd.Series([Path(filename).name for filename in filenames], dtype=object)
+    date_parts = names.str.extract(RESULTS_FILENAME_PATTERN, expand=False)
+    return pd.to_datetime(date_parts, format="%Y%m%d", errors="coerce")
+
+
+def analyze_csv_files(input_dir, output_dir, plot=True):
     """Main analysis function."""
     # Get all CSV files
     csv_files = get_csv_files(input_dir)
@@ -54,40 +202,104 @@ def analyze_csv_files(input_dir, output_dir):
         logging.warning("No CSV files found in the results directory.")
         return
 
-    logging.info(f"Found {len(csv_files)} CSV files")
+    logging.info("Found %d CSV files", len(csv_files))
 
-    # Count lines in each file
-    file_data = []
-    for file_path in csv_files:
-        line_count = count_lines_in_csv(file_path)
-        date = extract_date_from_filename(file_path)
-        file_data.append(
-            {
-                "filename": Path(file_path).name,
+    # Create output directory if it doesn't exist
+    output_path = Path(output_dir)
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    # Reuse cached counts for files whose size and mtime are unchanged
+    cache_path = output_path / LINE_COUNT_CACHE_FILENAME
+    cache = load_line_count_cache(cache_path)
+    line_counts = [None] * len(csv_files)
+    stale = []
+    for i, file_path in enumerate(csv_files):
+        st = os.stat(file_path)
+        name = Path(file_path).name
+        entry = cache.get(name)
+        if (
+            entry
+            and entry["size"] == st.st_size
+            and entry["mtime_ns"] == st.st_mtime_ns
+        ):
+            line_counts[i] = entry["line_count"]
+        else:
+            stale.append((i, name, st))
+
+    logging.info(
+        "Reusing cached line counts for %d files", len(csv_files) - len(stale)
+    )
+
+    # Count lines in the remaining files
+    if stale:
+        counts = count_lines_in_csv_files([csv_files[i] for i, _, _ in stale])
+        for (i, name, st), line_count in zip(stale, counts):
+            if line_count is None:
+                # Reported as 0 lines, but not cached so the next run retries
+                line_counts[i] = 0
+                cache.pop(name, None)
+                continue
+            line_counts[i] = line_count
+            cache[name] = {
+                "size": st.st_size,
+                "mtime_ns": st.st_mtime_ns,
                 "line_count": line_count,
-                "date": date,
-                "file_path": file_path,
             }
-        )
 
-    # Create DataFrame
-    df = pd.DataFrame(file_data)
-    df = df.sort_values("date") if "date" in df.columns else df.sort_values("filename")
+    # Drop entries of files that were deleted or renamed since the last run
+    removed = cache.keys() - {Path(file_path).name for file_path in csv_files}
+    for name in removed:
+        del cache[name]
+
+    if stale or removed:
+        save_line_count_cache(cache_path, cache)
+
+    # Create DataFrame column by column
+    df = pd.DataFrame(
+        {
+            "filename": [Path(file_path).name for file_path in csv_files],
+            "line_count": np.asarray(line_counts, dtype=np.int64),
+            "date": extract_dates_from_filenames(csv_files).to_numpy(),
+            "file_path": csv_files,
+        }
+    )
+    df = df.sort_values("date", kind="mergesort")
 
     # Print summary
     logging.info("\nSummary:")
-    logging.info(f"Total files: {len(df)}")
-    logging.info(f"Total lines: {df['line_count'].sum():,}")
-    logging.info(f"Average lines per file: {df['line_count'].mean():.1f}")
-    logging.info(f"Min lines: {df['line_count'].min()}")
-    logging.info(f"Max lines: {df['line_count'].max()}")
+    line_count = df["line_count"]
+    logging.info("Total files: %d", len(df))
+    logging.info("Total lines: %s", format(line_count.sum(), ","))
+    logging.info("Average lines per file: %.1f", line_count.mean())
+    logging.info("Min lines: %d", line_count.min())
+    logging.info("Max lines: %d", line_count.max())
 
     # Create visualization
+    if plot:
+        plot_line_counts(df, output_path)
+
+    # Save detailed results to CSV
+    output_csv = output_path / "line_count_summary.csv"
+    df.to_csv(output_csv, index=False)
+    logging.info("Detailed results saved as: %s", output_csv)
+
+    return df
+
+
+def plot_line_counts(df, output_path):
+    """Plot line counts per file and over time, saving the chart as PNG."""
+    plt.ioff()
     plt.style.use("seaborn-v0_8")
     fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(15, 12))
 
     # Bar chart by filename
-    ax1.bar(range(len(df)), df["line_count"], alpha=0.7, color="steelblue")
+    ax1.bar(
+        range(len(df)),
+        df["line_count"],
+        alpha=0.7,
+        color="steelblue",
+        rasterized=True,
+    )
     ax1.set_xlabel("CSV Files (chronological order)")
     ax1.set_ylabel("Number of Lines")
     ax1.set_title("Line Count per CSV File in Results Directory")
@@ -96,14 +308,10 @@ def analyze_csv_files(input_dir, output_dir):
     # Set x-axis labels (show every nth label to avoid overcrowding)
     step = max(1, len(df) // 20)  # Show at most 20 labels
     indices = range(0, len(df), step)
+    names = df["filename"].to_numpy()[indices]
     ax1.set_xticks(indices)
     ax1.set_xticklabels(
-        [
-            df.iloc[i]["filename"][:15] + "..."
-            if len(df.iloc[i]["filename"]) > 15
-            else df.iloc[i]["filename"]
-            for i in indices
-        ],
+        [name[:15] + "..." if len(name) > 15 else name for name in names],
         rotation=45,
         ha="right",
     )
@@ -118,6 +326,7 @@ def analyze_csv_files(input_dir, output_dir):
             linestyle="-",
             alpha=0.7,
             color="darkgreen",
+            rasterized=True,
         )
         ax2.set_xlabel("Date")
         ax2.set_ylabel("Number of Lines")
@@ -141,24 +350,20 @@ def analyze_csv_files(input_dir, output_dir):
 
     plt.tight_layout()
 
-    # Create output directory if it doesn't exist
-    output_path = Path(output_dir)
-    output_path.mkdir(parents=True, exist_ok=True)
-
     # Save the plot
     output_file = output_path / "csv_line_count_analysis.png"
-    plt.savefig(output_file, dpi=300, bbox_inches="tight")
-    logging.info(f"Visualization saved as: {output_file}")
-
-    # Show the plot
-    plt.show()
-
-    # Save detailed results to CSV
-    output_csv = output_path / "line_count_summary.csv"
-    df.to_csv(output_csv, index=False)
-    logging.info(f"Detailed results saved as: {output_csv}")
+    plt.savefig(
+        output_file,
+        dpi=150,
+        bbox_inches="tight",
+        pil_kwargs={"optimize": True},
+    )
+    logging.info("Visualization saved as: %s", output_file)
 
-    return df
+    # Show the plot only in interactive sessions with a GUI backend
+    if sys.stdout.isatty() and matplotlib.get_backend().lower() != "agg":
+        plt.show()
+    plt.close(fig)
 
 
 def parse_arguments():
@@ -180,6 +385,11 @@ def parse_arguments():
         default="output",
         help="Output directory for results and visualizations (default: output)",
     )
+    parser.add_argument(
+        "--no-plot",
+        action="store_true",
+        help="Only write the summary CSV, skipping the visualization",
+    )
     parser.add_argument(
         "--log",
         "-l",
@@ -218,14 +428,14 @@ if __name__ == "__main__":
     # Check if results directory exists
     input_path = Path(args.input)
     if not input_path.exists():
-        logging.error(f"Error: '{args.input}' directory not found.")
+        logging.error("Error: '%s' directory not found.", args.input)
         logging.error("Make sure the directory exists and the path is correct.")
         exit(1)
 
-    logging.info(f"Input directory: {args.input}")
-    logging.info(f"Output directory: {args.output}")
-    logging.info(f"Log file: {args.log}")
+    logging.info("Input directory: %s", args.input)
+    logging.info("Output directory: %s", args.output)
+    logging.info("Log file: %s", args.log)
     logging.info("")
 
     # Run analysis
-    df = analyze_csv_files(args.input, args.output)
+    df = analyze_csv_files(args.input, args.output, plot=not args.no_plot)
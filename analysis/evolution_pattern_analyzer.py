@@ -11,15 +11,81 @@ This tool provides insights into:
 """
 
 import argparse
-import csv
 import logging
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
 from typing import Dict, List, Tuple
 
+import numpy as np
+import pandas as pd
+
+# Integer codes for transition change types used by the vectorized analyses
+CHANGE_TYPE_CODES = {
+    "exact": 0,
+    "renamed": 1,
+    "moved": 2,
+    "signature_changed": 3,
+    "refactored": 4,
+    "token_hash": 5,
+}
+UNKNOWN_CHANGE_TYPE_CODE = -1
+
+# Columns of method_tracking_details.csv read by the analyzer
+DETAILS_COLUMNS = [
+    "snapshot_t",
+    "snapshot_t1",
+    "change_type",
+    "file_path",
+    "method_name",
+    "signature",
+    "line_range_t1",
+    "commit_t1",
+    "similarity",
+]
+
+# Columns of the transition arrays built from matched rows
+TRANSITION_COLUMNS = [
+    "snapshot_t",
+    "snapshot_t1",
+    "method_id",
+    "change_type",
+    "similarity",
+]
+
+# MethodSnapshot fields filled from the details CSV columns of added rows
+METHOD_SNAPSHOT_COLUMNS = {
+    "snapshot": "snapshot_t1",
+    "file_path": "file_path",
+    "method_name": "method_name",
+    "signature": "signature",
+    "line_range": "line_range_t1",
+    "commit": "commit_t1",
+}
+
+# Number of rows of the details CSV processed at a time
+DETAILS_CHUNK_SIZE = 200_000
+
+
+def encode_change_types(change_types: pd.Series) -> np.ndarray:
+    """Encode change type names as int8 codes (unknown names map to -1)."""
+    return (
+        change_types.map(CHANGE_TYPE_CODES)
+        .fillna(UNKNOWN_CHANGE_TYPE_CODE)
+        .to_numpy(dtype=np.int8)
+    )
+
+
+def intern_codes(values, vocab: Dict[str, int]) -> np.ndarray:
+    """Map strings to int32 codes, assigning new codes in first-seen order."""
+    return np.fromiter(
+        (vocab.setdefault(value, len(vocab)) for value in values),
+        dtype=np.int32,
+        count=len(values),
+    )
 
-@dataclass
+
+@dataclass(slots=True, frozen=True)
 class MethodSnapshot:
     """Represents a method at a specific snapshot."""
 
@@ -32,13 +98,13 @@ class MethodSnapshot:
     similarity: float = 1.0
 
 
-@dataclass
+@dataclass(slots=True)
 class MethodEvolution:
     """Represents the evolution of a method across snapshots."""
 
     method_id: str  # Unique identifier
     snapshots: List[MethodSnapshot]
-    change_types: List[str]  # History of change types
+    change_types: np.ndarray  # History of change types (int8 CHANGE_TYPE_CODES)
     birth_snapshot: str
     death_snapshot: str = None
 
@@ -52,25 +118,26 @@ class MethodEvolution:
         """Stability metric: ratio of exact matches to total transitions."""
         if len(self.change_types) == 0:
             return 1.0
-        exact_count = sum(1 for ct in self.change_types if ct == "exact")
-        return exact_count / len(self.change_types)
+        return float(np.mean(self.change_types == CHANGE_TYPE_CODES["exact"]))
 
     @property
     def was_renamed(self) -> bool:
         """Check if method was ever renamed."""
-        return "renamed" in self.change_types
+        return bool(np.any(self.change_types == CHANGE_TYPE_CODES["renamed"]))
 
     @property
     def was_moved(self) -> bool:
         """Check if method was ever moved to different file."""
-        return "moved" in self.change_types
+        return bool(np.any(self.change_types == CHANGE_TYPE_CODES["moved"]))
 
     @property
     def was_refactored(self) -> bool:
         """Check if method underwent refactoring."""
-        return (
-            "refactored" in self.change_types
-            or "signature_changed" in self.change_types
+        return bool(
+            np.any(
+                (self.change_types == CHANGE_TYPE_CODES["refactored"])
+                | (self.change_types == CHANGE_TYPE_CODES["signature_changed"])
+            )
         )
 
 
@@ -82,6 +149,19 @@ class EvolutionPatternAnalyzer:
         self.logger = self._setup_logging(log_file)
         self.method_evolutions: Dict[str, MethodEvolution] = {}
 
+        # Method instances per snapshot, stored column-wise (one array per
+        # MethodSnapshot field) with a (snapshot, method_id) -> row lookup
+        self.method_snapshot_columns: Dict[str, np.ndarray] = {}
+        self.method_snapshot_index: Dict[Tuple[int, str], int] = {}
+
+        # Repeated snapshot names and file paths are interned as int32 codes
+        self.snapshot_vocab: Dict[str, int] = {}
+        self.file_path_vocab: Dict[str, int] = {}
+        self.file_path_names: List[str] = []
+
+        # Matched transitions as typed columns (see TRANSITION_COLUMNS)
+        self.transitions: Dict[str, np.ndarray] = {}
+
     def _setup_logging(self, log_file: Path = None) -> logging.Logger:
         """Setup logging configuration."""
         logger = logging.getLogger(__name__)
@@ -112,54 +192,111 @@ class EvolutionPatternAnalyzer:
 
     def load_tracking_details(self, details_file: Path) -> None:
         """Load method tracking details and build evolution chains."""
-        self.logger.info(f"Loading tracking details from {details_file}")
+        self.logger.info("Loading tracking details from %s", details_file)
 
         # Track method instances across snapshots
-        method_by_snapshot: Dict[Tuple[str, str], MethodSnapshot] = {}
-        transitions: List[
-            Tuple[str, str, str, str, float]
-        ] = []  # (snap_t, snap_t1, method_t_id, method_t1_id, change_type, similarity)
-
-        with open(details_file, "r", encoding="utf-8") as f:
-            reader = csv.DictReader(f)
-            for row in reader:
-                snap_t = row["snapshot_t"]
-                snap_t1 = row["snapshot_t1"]
-                change_type = row["change_type"]
-
-                if change_type == "added":
-                    # New method in t1
-                    method_id = f"{row['file_path']}::{row['method_name']}"
-                    method_snapshot = MethodSnapshot(
-                        snapshot=snap_t1,
-                        file_path=row["file_path"],
-                        method_name=row["method_name"],
-                        signature=row["signature"],
-                        line_range=row["line_range_t1"],
-                        commit=row["commit_t1"],
-                        similarity=1.0,
-                    )
-                    method_by_snapshot[(snap_t1, method_id)] = method_snapshot
-
-                elif change_type == "deleted":
-                    # Method existed in t but not in t1
-                    pass
-
-                else:
-                    # Match types: exact, token_hash, renamed, moved, signature_changed, refactored
-                    method_id_t = f"{row['file_path']}::{row['method_name']}"
-                    similarity = float(row["similarity"]) if row["similarity"] else 1.0
-
-                    # Record transition
-                    transitions.append(
-                        (snap_t, snap_t1, method_id_t, change_type, similarity)
-                    )
-
-        self.logger.info(f"Loaded {len(transitions)} method transitions")
+        snapshot_columns: Dict[str, List] = {
+            field: [] for field in METHOD_SNAPSHOT_COLUMNS
+        }
+        snapshot_index: Dict[Tuple[int, str], int] = {}
+
+        chunks = pd.read_csv(
+            details_file,
+            usecols=DETAILS_COLUMNS,
+            dtype={column: str for column in DETAILS_COLUMNS if column != "similarity"},
+            keep_default_na=False,
+            na_values={"similarity": [""]},
+            chunksize=DETAILS_CHUNK_SIZE,
+        )
+        transition_chunks: Dict[str, List[np.ndarray]] = {
+            column: [] for column in TRANSITION_COLUMNS
+        }
+        for chunk in chunks:
+            change_type = chunk["change_type"]
+            method_ids = chunk["file_path"] + "::" + chunk["method_name"]
+            snap_t = intern_codes(chunk["snapshot_t"], self.snapshot_vocab)
+            snap_t1 = intern_codes(chunk["snapshot_t1"], self.snapshot_vocab)
+
+            # New methods in t1
+            added_mask = (change_type == "added").to_numpy()
+            first_row = len(snapshot_columns["snapshot"])
+            snapshot_columns["snapshot"].extend(snap_t1[added_mask])
+            snapshot_columns["file_path"].extend(
+                intern_codes(chunk["file_path"][added_mask], self.file_path_vocab)
+            )
+            for field in ("method_name", "signature", "line_range", "commit"):
+                column = METHOD_SNAPSHOT_COLUMNS[field]
+                snapshot_columns[field].extend(chunk[column][added_mask])
+            snapshot_index.update(
+                zip(
+                    zip(snap_t1[added_mask].tolist(), method_ids[added_mask]),
+                    range(first_row, len(snapshot_columns["snapshot"])),
+                )
+            )
+
+            # Deleted methods existed in t but not in t1 and are skipped.
+            # Match types: exact, token_hash, renamed, moved, signature_changed, refactored
+            match_mask = ~added_mask & (change_type != "deleted").to_numpy()
+            similarity = chunk["similarity"][match_mask].fillna(1.0)
+            transition_chunks["snapshot_t"].append(snap_t[match_mask])
+            transition_chunks["snapshot_t1"].append(snap_t1[match_mask])
+            transition_chunks["method_id"].append(
+                method_ids[match_mask].to_numpy(dtype=object)
+            )
+            transition_chunks["change_type"].append(
+                encode_change_types(change_type[match_mask])
+            )
+            # An empty chunk reads similarity as object; keep the column float
+            transition_chunks["similarity"].append(
+                similarity.to_numpy(dtype=np.float64)
+            )
+
+        self.transitions = {
+            column: np.concatenate(parts) for column, parts in transition_chunks.items()
+        }
+
+        self.method_snapshot_columns = {
+            field: np.asarray(values, dtype=object)
+            for field, values in snapshot_columns.items()
+        }
+        self.method_snapshot_columns["snapshot"] = np.asarray(
+            snapshot_columns["snapshot"], dtype=np.int32
+        )
+        self.method_snapshot_columns["file_path"] = np.asarray(
+            snapshot_columns["file_path"], dtype=np.int32
+        )
+        self.method_snapshot_columns["similarity"] = np.ones(
+            len(snapshot_columns["snapshot"]), dtype=np.float64
+        )
+        self.method_snapshot_index = snapshot_index
+        self.file_path_names = list(self.file_path_vocab)
+
+        self.logger.info(
+            "Loaded %d method transitions", len(self.transitions["method_id"])
+        )
 
         # Build evolution chains
         # TODO: Implement chain building logic
 
+    def get_method_snapshot(
+        self, snapshot: str, method_id: str
+    ) -> MethodSnapshot | None:
+        """Return the method instance recorded at a snapshot, if any."""
+        snapshot_code = self.snapshot_vocab.get(snapshot)
+        row = self.method_snapshot_index.get((snapshot_code, method_id))
+        if row is None:
+            return None
+        columns = self.method_snapshot_columns
+        return MethodSnapshot(
+            snapshot=snapshot,
+            file_path=self.file_path_names[columns["file_path"][row]],
+            method_name=columns["method_name"][row],
+            signature=columns["signature"][row],
+            line_range=columns["line_range"][row],
+            commit=columns["commit"][row],
+            similarity=float(columns["similarity"][row]),
+        )
+
     def analyze_lifecycle_patterns(self) -> Dict[str, any]:
         """Analyze method lifecycle patterns."""
         stats = {
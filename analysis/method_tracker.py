@@ -10,18 +10,81 @@ Features / improvements over previous version:
 """
 
 import argparse
+import atexit
 import csv
+import io
 import logging
-from dataclasses import dataclass
+import logging.handlers
+import os
+import queue
+import warnings
+from collections import Counter, deque
+from collections.abc import Mapping
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from dataclasses import dataclass, field
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import Dict, List, Optional, Set, Tuple
-
-from similarity_calculator import SimilarityCalculator
+from typing import (
+    BinaryIO,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Set,
+    Tuple,
+    Union,
+)
+
+import numpy as np
+import pandas as pd
+from parse_cache import file_stamp, load_cached, store_cached
+from similarity_calculator import NgramIndex, SimilarityCalculator
 from tqdm import tqdm
 
-
-@dataclass(frozen=True)
+# Column layout of code_blocks.csv
+CODE_BLOCK_COLUMNS = [
+    "token_hash",
+    "file_path",
+    "start_line",
+    "end_line",
+    "method_name",
+    "return_type",
+    "parameters",
+    "commit_hash",
+    "token_sequence",
+]
+# Columns identifying a method across snapshots; hashed into the snapshot key
+METHOD_KEY_COLUMNS = ["file_path", "method_name", "parameters", "return_type"]
+# read_csv dtypes: text everywhere except the start/end line numbers
+LINE_NUMBER_DTYPES = {
+    i: (np.int32 if col in ("start_line", "end_line") else str)
+    for i, col in enumerate(CODE_BLOCK_COLUMNS)
+}
+# Number of columns in legacy code_blocks.csv rows (skipped row by row)
+LEGACY_COLUMN_COUNT = 3
+# Text columns whose values repeat heavily within and across snapshots
+INTERNED_COLUMNS = [
+    "file_path",
+    "method_name",
+    "return_type",
+    "parameters",
+    "commit_hash",
+]
+# Rows of unmatched methods whose N-gram similarities are computed per batch
+SIMILARITY_ROW_CHUNK = 256
+# Minimum unmatched rows before similarity scoring is spread over processes
+PARALLEL_SIMILARITY_MIN_ROWS = 4 * SIMILARITY_ROW_CHUNK
+# Bumped whenever the pickled read_code_blocks() result changes layout
+PARSE_CACHE_VERSION = 3
+# Write buffer for the (large) details CSV
+OUTPUT_BUFFER_SIZE = 1 << 20
+# csv.writer's default line terminator, kept for the hand-built details rows
+DETAILS_LINE_TERMINATOR = "\r\n"
+
+
+@dataclass(slots=True)
 class MethodInfo:
     file_path: str
     start_line: int
@@ -32,20 +95,20 @@ class MethodInfo:
     commit_hash: str
     token_hash: str
     token_sequence: Optional[List[int]] = None
+    key: int = 0
+    signature: str = field(init=False, repr=False)
+    full_id: str = field(init=False, repr=False)
 
-    @property
-    def signature(self) -> str:
-        return f"{self.method_name}:{self.parameters}:{self.return_type}"
-
-    @property
-    def full_id(self) -> str:
-        return f"{self.file_path}::{self.signature}"
+    def __post_init__(self) -> None:
+        # Computed once here instead of formatting on every access
+        self.signature = f"{self.method_name}:{self.parameters}:{self.return_type}"
+        self.full_id = f"{self.file_path}::{self.signature}"
 
     def __str__(self) -> str:
         return f"{self.file_path}:{self.start_line}-{self.end_line}:{self.method_name}"
 
 
-@dataclass
+@dataclass(slots=True)
 class MethodMatch:
     method_t: MethodInfo
     method_t1: MethodInfo
@@ -53,6 +116,121 @@ class MethodMatch:
     similarity: float = 1.0
 
 
+class MethodTable(Mapping):
+    """Column-oriented (SoA) methods of one snapshot, keyed by method key.
+
+    MethodInfo objects are only materialized on lookup, and token sequences
+    are parsed at that point, so exact matches never have to pay for them.
+    """
+
+    def __init__(
+        self, name: str, keys: np.ndarray, columns: Dict[str, np.ndarray]
+    ) -> None:
+        self.logger = logging.getLogger(__name__)
+        self.name = name
+        self.columns = columns
+        # Later rows win on duplicate keys, like plain dict assignment
+        self._rows: Dict[int, int] = dict(zip(keys.tolist(), range(len(keys))))
+        self.keys_array = np.fromiter(
+            self._rows, dtype=np.uint64, count=len(self._rows)
+        )
+
+    def __len__(self) -> int:
+        return len(self._rows)
+
+    def __iter__(self) -> Iterator[int]:
+        return iter(self._rows)
+
+    def __contains__(self, key: object) -> bool:
+        return key in self._rows
+
+    def __getitem__(self, key: int) -> MethodInfo:
+        return self.method(key)
+
+    def method(self, key: int, with_tokens: bool = True) -> MethodInfo:
+        """Materialize one method; token parsing can be skipped when unused."""
+        row = self._rows[key]
+        columns = self.columns
+        token_sequence = None
+        if with_tokens:
+            token_sequence = self._parse_token_sequence(columns["token_sequence"][row])
+        return MethodInfo(
+            file_path=columns["file_path"][row],
+            start_line=int(columns["start_line"][row]),
+            end_line=int(columns["end_line"][row]),
+            method_name=columns["method_name"][row],
+            return_type=columns["return_type"][row],
+            parameters=columns["parameters"][row],
+            commit_hash=columns["commit_hash"][row],
+            token_hash=columns["token_hash"][row],
+            token_sequence=token_sequence,
+            key=key,
+        )
+
+    def column(self, name: str, keys: Iterable[int]) -> np.ndarray:
+        """Return one column's values for the given method keys."""
+        rows = np.fromiter((self._rows[key] for key in keys), dtype=np.intp)
+        return self.columns[name][rows]
+
+    def intern_strings(self, cache: Dict[str, str]) -> None:
+        """Share equal strings of INTERNED_COLUMNS through a cross-snapshot cache."""
+        for name in INTERNED_COLUMNS:
+            codes, uniques = pd.factorize(self.columns[name])
+            shared = np.array(
+                [cache.setdefault(value, value) for value in uniques], dtype=object
+            )
+            self.columns[name] = shared[codes]
+
+    def methods(self, keys: Iterable[int]) -> Dict[int, MethodInfo]:
+        """Materialize several methods, parsing their token sequences together."""
+        keys = list(keys)
+        sequences = self._parse_token_sequences(
+            self.column("token_sequence", keys).tolist()
+        )
+        result: Dict[int, MethodInfo] = {}
+        for key, token_sequence in zip(keys, sequences):
+            method = self.method(key, with_tokens=False)
+            method.token_sequence = token_sequence
+            result[key] = method
+        return result
+
+    def _parse_token_sequences(
+        self, token_seq_strs: List[str]
+    ) -> List[Optional[List[int]]]:
+        """Parse many "[t1;t2;...]" strings with a single np.fromstring call."""
+        bodies = [s.strip().strip("[]") for s in token_seq_strs]
+        present = [body for body in bodies if body]
+        try:
+            tokens = np.fromstring(";".join(present), dtype=np.int64, sep=";")
+            lengths = [body.count(";") + 1 for body in present]
+            if len(tokens) != sum(lengths):
+                raise ValueError("token count mismatch")
+        except ValueError:
+            # Malformed tokens somewhere: fall back to the lenient parser
+            return [self._parse_token_sequence(s) for s in token_seq_strs]
+
+        pieces = iter(np.split(tokens, np.cumsum(lengths)[:-1]) if present else [])
+        return [next(pieces).tolist() if body else None for body in bodies]
+
+    def _parse_token_sequence(self, token_seq_str: str) -> Optional[List[int]]:
+        if not token_seq_str or not token_seq_str.strip():
+            return None
+
+        body = token_seq_str.strip().strip("[]")
+        parts = [p.strip() for p in body.split(";") if p and p.strip()]
+        seq: List[int] = []
+        invalid: List[str] = []
+        for t in parts:
+            try:
+                seq.append(int(t))
+            except Exception:
+                invalid.append(t)
+        # ignore non-integer tokens but log them once at debug level
+        if invalid and self.logger.isEnabledFor(logging.DEBUG):
+            self.logger.debug(f"{self.name}: invalid tokens in sequence: {invalid}")
+        return seq
+
+
 class SimilarityWrapper:
     """Wrap SimilarityCalculator to normalize scores to 0..1."""
 
@@ -68,8 +246,9 @@ class SimilarityWrapper:
         except Exception:
             return 0.0
 
-        # If value looks like percentage (> 1.0), scale to 0..1
-        if v > 1.0:
+        # SimilarityCalculator returns integer percentages (so 1 means 1%);
+        # other values that look like percentages (> 1.0) are scaled too
+        if isinstance(value, int) or v > 1.0:
             v = v / 100.0
 
         # Clamp
@@ -83,10 +262,256 @@ class SimilarityWrapper:
         raw = self.calc.calc_ngram_similarity(a, b)
         return self._normalize(raw)
 
+    def ngram_hashes(self, tokens: List[int]) -> np.ndarray:
+        return self.calc.ngram_hashes(tokens)
+
+    def ngram_hashes_many(self, sequences: List[List[int]]) -> List[np.ndarray]:
+        return self.calc.ngram_hashes_many(sequences)
+
+    def build_ngram_index(self, ngrams: List[np.ndarray]) -> NgramIndex:
+        return self.calc.build_ngram_index(ngrams)
+
+    def calc_ngram_similarity_pairs(
+        self, a: List[np.ndarray], b: Union[List[np.ndarray], NgramIndex]
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        rows, cols, raw = self.calc.calc_ngram_similarity_pairs(a, b)
+        return rows, cols, np.clip(raw / 100.0, 0.0, 1.0)
+
     def calc_lcs_similarity(self, a: List[int], b: List[int]) -> float:
         raw = self.calc.calc_lcs_similarity(a, b)
         return self._normalize(raw)
 
+    def calc_lcs_similarity_bound(self, a: Counter, b: Counter) -> float:
+        raw = self.calc.calc_lcs_similarity_bound(a, b)
+        return self._normalize(raw)
+
+
+@dataclass(slots=True)
+class SimilarityContext:
+    """Snapshot t1 data every block of similarity rows is scored against."""
+
+    calc: SimilarityWrapper
+    tokens_t1: List[List[int]]
+    ngram_index_t1: NgramIndex
+    ngram_threshold: float
+    lcs_threshold: float
+
+
+# Context of a similarity worker process (set by its initializer)
+_worker_similarity_context: Optional[SimilarityContext] = None
+
+
+def _init_similarity_worker(context: SimilarityContext) -> None:
+    global _worker_similarity_context
+    _worker_similarity_context = context
+
+
+def _similarity_edges(
+    context: SimilarityContext,
+    tokens_t: List[List[int]],
+    ngrams_t: List[np.ndarray],
+    offset: int,
+) -> List[Tuple[float, int, int]]:
+    """Score a block of t rows (starting at row offset) against all of t1.
+
+    Returns the (lcs_similarity, t index, t1 index) pairs passing both
+    thresholds.
+    """
+    calc = context.calc
+    tokens_t1 = context.tokens_t1
+    rows, cols, ngram_sims = calc.calc_ngram_similarity_pairs(
+        ngrams_t, context.ngram_index_t1
+    )
+    passing = ngram_sims >= context.ngram_threshold
+    cols = cols[passing]
+    # Pairs come sorted by row: row r's candidates are cols[starts[r]:starts[r + 1]]
+    starts = np.searchsorted(rows[passing], np.arange(len(tokens_t) + 1))
+    # Pairs without a shared N-gram are not listed; a zero threshold passes them too
+    all_t1 = np.arange(len(tokens_t1)) if context.ngram_threshold <= 0 else None
+
+    token_counts_t1: Dict[int, Counter] = {}
+    edges = []
+    for r, tokens in enumerate(tokens_t):
+        i = offset + r
+        candidates = all_t1 if all_t1 is not None else cols[starts[r] : starts[r + 1]]
+        counts = Counter(tokens) if len(candidates) else None
+        for j in candidates.tolist():
+            if j not in token_counts_t1:
+                token_counts_t1[j] = Counter(tokens_t1[j])
+            # Skip the LCS when even its upper bound can't pass the threshold
+            bound = calc.calc_lcs_similarity_bound(counts, token_counts_t1[j])
+            if bound < context.lcs_threshold:
+                continue
+            lcs_sim = calc.calc_lcs_similarity(tokens, tokens_t1[j])
+            if lcs_sim >= context.lcs_threshold:
+                edges.append((lcs_sim, i, j))
+    return edges
+
+
+def _similarity_edges_in_worker(
+    tokens_t: List[List[int]], ngrams_t: List[np.ndarray], offset: int
+) -> List[Tuple[float, int, int]]:
+    return _similarity_edges(_worker_similarity_context, tokens_t, ngrams_t, offset)
+
+
+def _read_code_block_rows(
+    file_path: Path, dtype: Optional[Dict[int, type]]
+) -> Tuple[pd.DataFrame, List[warnings.WarningMessage]]:
+    with warnings.catch_warnings(record=True) as caught:
+        warnings.simplefilter("always", pd.errors.ParserWarning)
+        df = pd.read_csv(
+            file_path,
+            header=None,
+            dtype=str if dtype is None else dtype,
+            na_filter=False,
+            encoding="utf-8",
+            on_bad_lines="warn",
+            # mmap cannot map empty files; read_csv reports those as empty
+            memory_map=file_path.stat().st_size > 0,
+        )
+    return df, caught
+
+
+def _read_code_block_rows_by_width(
+    file_path: Path,
+) -> Tuple[pd.DataFrame, List[str]]:
+    """Read rows with csv.reader, keeping only full-width rows.
+
+    Used when read_csv may have padded short rows. Legacy rows are skipped;
+    rows of any other width are returned as per-row errors.
+    """
+    rows: List[List[str]] = []
+    row_errors: List[str] = []
+    with open(file_path, "r", encoding="utf-8", newline="") as f:
+        for row_num, row in enumerate(filter(None, csv.reader(f)), 1):
+            if len(row) == len(CODE_BLOCK_COLUMNS):
+                rows.append(row)
+            elif len(row) != LEGACY_COLUMN_COUNT:
+                row_errors.append(
+                    f"Row {row_num}: Unexpected format ({len(row)} columns)"
+                )
+    return pd.DataFrame(rows, columns=CODE_BLOCK_COLUMNS, dtype=object), row_errors
+
+
+def read_code_blocks(file_path: Path) -> Tuple[MethodTable, List[Tuple[int, str]]]:
+    """Parse one code_blocks.csv into a MethodTable.
+
+    Module-level so it can run in worker processes; log messages are returned
+    as (level, message) pairs for the caller to emit.
+    """
+    log_records: List[Tuple[int, str]] = []
+    # Per-row problems are collected and reported once at the end
+    row_errors: List[str] = []
+
+    # Tokenize the whole file in one C-level call, converting the line number
+    # columns in the C parser too; rows with too many columns are skipped by
+    # pandas and reported as ParserWarnings.
+    try:
+        df, caught = _read_code_block_rows(file_path, LINE_NUMBER_DTYPES)
+    except pd.errors.EmptyDataError:
+        df, caught = pd.DataFrame(columns=CODE_BLOCK_COLUMNS), []
+    except ValueError:
+        # Non-integer line numbers: re-read as text and coerce per row below
+        df, caught = _read_code_block_rows(file_path, None)
+
+    for w in caught:
+        for message in str(w.message).splitlines():
+            if message.startswith("Skipping line"):
+                row_errors.append(message)
+
+    # read_csv takes its width from the first row and pads narrower rows with
+    # empty fields, so a short or legacy row looks like a method with an empty
+    # token_sequence. Classify rows by field count with csv.reader when that
+    # is possible.
+    if df.shape[1] != len(CODE_BLOCK_COLUMNS) or (df.iloc[:, -1] == "").any():
+        df, row_errors = _read_code_block_rows_by_width(file_path)
+
+    df.columns = CODE_BLOCK_COLUMNS
+    start = pd.to_numeric(df["start_line"], errors="coerce")
+    end = pd.to_numeric(df["end_line"], errors="coerce")
+    valid = (start.notna() & end.notna()).to_numpy()
+
+    row_errors.extend(
+        f"Row {row_num + 1}: invalid line numbers" for row_num in (~valid).nonzero()[0]
+    )
+
+    df = df[valid]
+    text = pd.DataFrame(
+        {
+            col: df[col].str.strip()
+            for col in CODE_BLOCK_COLUMNS
+            if col not in ("start_line", "end_line", "token_sequence")
+        }
+    )
+    # Deterministic 64-bit key per method (stable across processes)
+    key_series = pd.util.hash_pandas_object(text[METHOD_KEY_COLUMNS], index=False)
+    keys = key_series.to_numpy(dtype=np.uint64)
+
+    duplicated = key_series.duplicated(keep=False).to_numpy()
+    if duplicated.any():
+        distinct = (
+            text.loc[duplicated, METHOD_KEY_COLUMNS]
+            .groupby(keys[duplicated])
+            .nunique()
+            .gt(1)
+            .any(axis=1)
+        )
+        for key in distinct.index[distinct]:
+            log_records.append(
+                (
+                    logging.WARNING,
+                    f"{file_path.name}: Method key collision on {key}",
+                )
+            )
+
+    columns = {col: text[col].to_numpy(dtype=object) for col in text.columns}
+    columns["start_line"] = start[valid].to_numpy(dtype=np.int32)
+    columns["end_line"] = end[valid].to_numpy(dtype=np.int32)
+    columns["token_sequence"] = df["token_sequence"].to_numpy(dtype=object)
+    # 64-bit token-hash keys let token-hash matching join on integers
+    columns["token_hash_key"] = pd.util.hash_array(columns["token_hash"])
+
+    methods = MethodTable(file_path.name, keys, columns)
+
+    if row_errors:
+        log_records.append(
+            (
+                logging.WARNING,
+                f"{file_path.name}: Parsed with {len(row_errors)} errors, {len(methods)} methods extracted (first: {row_errors[0]})",
+            )
+        )
+        log_records.append(
+            (logging.DEBUG, f"{file_path.name}: " + "; ".join(row_errors))
+        )
+    else:
+        log_records.append(
+            (logging.INFO, f"{file_path.name}: {len(methods)} methods extracted")
+        )
+
+    return methods, log_records
+
+
+def read_code_blocks_cached(
+    file_path: Path, cache_dir: Optional[Path]
+) -> Tuple[MethodTable, List[Tuple[int, str]]]:
+    """read_code_blocks() through an on-disk cache keyed by file mtime and size."""
+    if cache_dir is None:
+        return read_code_blocks(file_path)
+
+    stamp = file_stamp(file_path, PARSE_CACHE_VERSION)
+    cache_path = cache_dir / f"{file_path.parent.name}_{file_path.stem}.pkl"
+    result = load_cached(cache_path, stamp)
+    if result is not None:
+        return result
+
+    methods, log_records = read_code_blocks(file_path)
+    error = store_cached(cache_path, stamp, (methods, log_records))
+    if error is not None:
+        log_records = log_records + [
+            (logging.WARNING, f"Failed to write parse cache {cache_path}: {error}")
+        ]
+    return methods, log_records
+
 
 class MethodTracker:
     def __init__(
@@ -95,11 +520,13 @@ class MethodTracker:
         use_similarity: bool = False,
         ngram_threshold: float = 0.10,
         lcs_threshold: float = 0.70,
+        cache_dir: Optional[Path] = None,
     ) -> None:
         """Initialize MethodTracker.
 
         ngram_threshold and lcs_threshold are expected as normalized floats (0..1).
         CLI accepts percentages (e.g. 10, 70) or fractions (0.1, 0.7).
+        Parsed snapshots are cached in cache_dir when it is given.
         """
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
@@ -122,10 +549,18 @@ class MethodTracker:
             )
             file_handler.setFormatter(formatter)
             console_handler.setFormatter(formatter)
-            self.logger.addHandler(file_handler)
-            self.logger.addHandler(console_handler)
+            # Records are formatted and written on a listener thread so the
+            # matching loops never block on file or console I/O
+            log_queue: queue.Queue = queue.Queue(-1)
+            listener = logging.handlers.QueueListener(
+                log_queue, file_handler, console_handler, respect_handler_level=True
+            )
+            listener.start()
+            atexit.register(listener.stop)
+            self.logger.addHandler(logging.handlers.QueueHandler(log_queue))
 
         self.log_file = log_file
+        self.cache_dir = cache_dir
 
         # Similarity configuration
         self.use_similarity = use_similarity
@@ -133,6 +568,9 @@ class MethodTracker:
         self.ngram_threshold = self._normalize_threshold(ngram_threshold)
         self.lcs_threshold = self._normalize_threshold(lcs_threshold)
 
+        # Strings shared between snapshots (file paths, method names, ...)
+        self._string_cache: Dict[str, str] = {}
+
         self.similarity_calc = None
         if self.use_similarity:
             self.similarity_calc = SimilarityWrapper(gram_size=5)
@@ -154,154 +592,104 @@ class MethodTracker:
             return 1.0
         return v
 
-    def parse_code_blocks(self, file_path: Path) -> Dict[str, MethodInfo]:
-        methods: Dict[str, MethodInfo] = {}
-        error_count = 0
-
+    def parse_code_blocks(self, file_path: Path) -> MethodTable:
+        """Parse one code_blocks.csv in this process (see read_code_blocks())."""
         try:
-            with open(file_path, "r", encoding="utf-8") as f:
-                reader = csv.reader(f)
-                for line_num, row in enumerate(reader, 1):
-                    if not row:
-                        continue
-
-                    try:
-                        if len(row) == 9:
-                            token_hash_val = row[0].strip()
-                            file_p = row[1].strip()
-                            start = int(row[2])
-                            end = int(row[3])
-                            method = row[4].strip()
-                            ret_type = row[5].strip()
-                            params = row[6].strip()
-                            commit_hash = row[7].strip()
-                            token_seq_str = row[8]
-
-                            token_sequence: Optional[List[int]] = None
-                            if token_seq_str and token_seq_str.strip():
-                                parts = [
-                                    p.strip()
-                                    for p in token_seq_str.split(";")
-                                    if p and p.strip()
-                                ]
-                                seq: List[int] = []
-                                for t in parts:
-                                    try:
-                                        seq.append(int(t))
-                                    except Exception:
-                                        # ignore non-integer tokens but log once at debug level
-                                        self.logger.debug(
-                                            f"{file_path.name}:{line_num}: invalid token in sequence: {t}"
-                                        )
-                                token_sequence = seq
-
-                            method_info = MethodInfo(
-                                file_path=file_p,
-                                start_line=start,
-                                end_line=end,
-                                method_name=method,
-                                return_type=ret_type,
-                                parameters=params,
-                                commit_hash=commit_hash,
-                                token_hash=token_hash_val,
-                                token_sequence=token_sequence,
-                            )
-
-                            methods[method_info.full_id] = method_info
-
-                        elif len(row) == 3:
-                            # legacy format: skip
-                            continue
-                        else:
-                            error_count += 1
-                            self.logger.warning(
-                                f"{file_path.name}:{line_num}: Unexpected format ({len(row)} columns)"
-                            )
-
-                    except Exception as e:
-                        error_count += 1
-                        self.logger.warning(
-                            f"{file_path.name}:{line_num}: Error parsing line - {str(e)}"
-                        )
-
+            methods, log_records = read_code_blocks(file_path)
         except Exception as e:
             self.logger.error(f"Failed to read {file_path}: {str(e)}")
             raise
+        return self._adopt_snapshot(methods, log_records)
+
+    def _adopt_snapshot(
+        self, methods: MethodTable, log_records: List[Tuple[int, str]]
+    ) -> MethodTable:
+        """Emit the log records of a parsed snapshot and share its strings."""
+        for level, message in log_records:
+            self.logger.log(level, message)
+        methods.intern_strings(self._string_cache)
+        return methods
 
-        if error_count > 0:
-            self.logger.warning(
-                f"{file_path.name}: Parsed with {error_count} errors, {len(methods)} methods extracted"
-            )
-        else:
-            self.logger.info(f"{file_path.name}: {len(methods)} methods extracted")
+    @staticmethod
+    def _key_array(keys) -> np.ndarray:
+        return np.fromiter(keys, dtype=np.uint64, count=len(keys))
 
-        return methods
+    @classmethod
+    def _remove_keys(cls, keys: np.ndarray, matched: List[int]) -> np.ndarray:
+        """Drop matched keys from a key array, preserving snapshot order."""
+        if not matched:
+            return keys
+        return keys[~np.isin(keys, cls._key_array(matched), assume_unique=True)]
 
     def find_exact_matches(
         self,
-        snapshot_t: Dict[str, MethodInfo],
-        snapshot_t1: Dict[str, MethodInfo],
+        snapshot_t: MethodTable,
+        snapshot_t1: MethodTable,
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Return masks over both snapshots' keys marking exact matches.
+
+        Exact matches stay as keys; no MethodMatch objects are built for them.
+        """
+        keys_t = snapshot_t.keys_array
+        keys_t1 = snapshot_t1.keys_array
+
+        # One intersection yields the common keys' positions on both sides
+        _, common_t, common_t1 = np.intersect1d(
+            keys_t, keys_t1, assume_unique=True, return_indices=True
+        )
+        exact_t = np.zeros(len(keys_t), dtype=bool)
+        exact_t[common_t] = True
+        exact_t1 = np.zeros(len(keys_t1), dtype=bool)
+        exact_t1[common_t1] = True
+        return exact_t, exact_t1
+
+    def find_token_hash_matches(
+        self,
+        snapshot_t: MethodTable,
+        snapshot_t1: MethodTable,
+        keys_t: np.ndarray,
+        keys_t1: np.ndarray,
     ) -> List[MethodMatch]:
+        """Pair methods with identical token hashes, first come first served.
+
+        The n-th method with a given hash in keys_t pairs with the n-th one in
+        keys_t1; the pairing is a join on the uint64 token-hash key column.
+        """
+        sides = []
+        for snapshot, keys in ((snapshot_t, keys_t), (snapshot_t1, keys_t1)):
+            key_list = keys.tolist()
+            hashes = pd.Series(snapshot.column("token_hash_key", key_list))
+            side = pd.DataFrame(
+                {"hash": hashes, "rank": hashes.groupby(hashes).cumcount(), "key": keys}
+            )
+            sides.append(side[snapshot.column("token_hash", key_list) != ""])
+        pairs = sides[0].merge(sides[1], on=["hash", "rank"], suffixes=("_t", "_t1"))
+
         matches: List[MethodMatch] = []
-        for full_id, method_info in snapshot_t.items():
-            if full_id in snapshot_t1:
+        for key_t, key_t1 in zip(pairs["key_t"].tolist(), pairs["key_t1"].tolist()):
+            method_t = snapshot_t.method(key_t, with_tokens=False)
+            method_t1 = snapshot_t1.method(key_t1, with_tokens=False)
+            # Guard against collisions of the 64-bit token-hash keys
+            if method_t.token_hash == method_t1.token_hash:
                 matches.append(
                     MethodMatch(
-                        method_t=method_info,
-                        method_t1=snapshot_t1[full_id],
-                        match_type="exact",
+                        method_t=method_t,
+                        method_t1=method_t1,
+                        match_type="token_hash",
                         similarity=1.0,
                     )
                 )
-        return matches
-
-    def find_token_hash_matches(
-        self,
-        unmatched_t: Dict[str, MethodInfo],
-        unmatched_t1: Dict[str, MethodInfo],
-    ) -> List[MethodMatch]:
-        matches: List[MethodMatch] = []
-
-        hash_to_methods_t: Dict[str, List[MethodInfo]] = {}
-        for method in unmatched_t.values():
-            if method.token_hash:
-                hash_to_methods_t.setdefault(method.token_hash, []).append(method)
-
-        hash_to_methods_t1: Dict[str, List[MethodInfo]] = {}
-        for method in unmatched_t1.values():
-            if method.token_hash:
-                hash_to_methods_t1.setdefault(method.token_hash, []).append(method)
-
-        for token_hash, methods_t in hash_to_methods_t.items():
-            if token_hash in hash_to_methods_t1:
-                methods_t1 = hash_to_methods_t1[token_hash][:]
-                for method_t in methods_t:
-                    if not methods_t1:
-                        break
-                    method_t1 = methods_t1.pop(0)
-                    matches.append(
-                        MethodMatch(
-                            method_t=method_t,
-                            method_t1=method_t1,
-                            match_type="token_hash",
-                            similarity=1.0,
-                        )
-                    )
 
         return matches
 
     def find_similarity_matches(
         self,
-        unmatched_t: Dict[str, MethodInfo],
-        unmatched_t1: Dict[str, MethodInfo],
+        unmatched_t: Dict[int, MethodInfo],
+        unmatched_t1: Dict[int, MethodInfo],
     ) -> List[MethodMatch]:
         if not self.use_similarity or self.similarity_calc is None:
             return []
 
-        matches: List[MethodMatch] = []
-        matched_t: Set[str] = set()
-        matched_t1: Set[str] = set()
-
         methods_t = [
             (mid, m)
             for mid, m in unmatched_t.items()
@@ -317,103 +705,226 @@ class MethodTracker:
             f"Finding similarity matches: {len(methods_t)} x {len(methods_t1)} comparisons"
         )
 
-        for method_id_t, method_t in methods_t:
-            if method_id_t in matched_t:
-                continue
-
-            best_match = None
-            best_lcs_sim = 0.0
-
-            for method_id_t1, method_t1 in methods_t1:
-                if method_id_t1 in matched_t1:
-                    continue
-
-                ngram_sim = self.similarity_calc.calc_ngram_similarity(
-                    method_t.token_sequence, method_t1.token_sequence
-                )
-
-                if ngram_sim < self.ngram_threshold:
-                    continue
-
-                lcs_sim = self.similarity_calc.calc_lcs_similarity(
-                    method_t.token_sequence, method_t1.token_sequence
-                )
+        # Identical token sequences get identical scores, so each distinct
+        # sequence is scored once and its edges are shared by the group
+        groups_t = self._group_identical_sequences(methods_t)
+        groups_t1 = self._group_identical_sequences(methods_t1)
+
+        # Hash every sequence's N-grams once instead of once per compared pair,
+        # in one pass over a flat token buffer per snapshot
+        ngram_hashes_many = self.similarity_calc.ngram_hashes_many
+        tokens_t = [methods_t[group[0]][1].token_sequence for group in groups_t]
+        ngrams_t = ngram_hashes_many(tokens_t)
+        tokens_t1 = [methods_t1[group[0]][1].token_sequence for group in groups_t1]
+        context = SimilarityContext(
+            calc=self.similarity_calc,
+            tokens_t1=tokens_t1,
+            ngram_index_t1=self.similarity_calc.build_ngram_index(
+                ngram_hashes_many(tokens_t1)
+            ),
+            ngram_threshold=self.ngram_threshold,
+            lcs_threshold=self.lcs_threshold,
+        )
 
-                if lcs_sim >= self.lcs_threshold and lcs_sim > best_lcs_sim:
-                    best_lcs_sim = lcs_sim
-                    best_match = (method_id_t1, method_t1, lcs_sim)
+        starts = range(0, len(tokens_t), SIMILARITY_ROW_CHUNK)
+        blocks = (
+            [tokens_t[i : i + SIMILARITY_ROW_CHUNK] for i in starts],
+            [ngrams_t[i : i + SIMILARITY_ROW_CHUNK] for i in starts],
+            starts,
+        )
+        workers = os.cpu_count() or 1
+        if workers > 1 and len(tokens_t) >= PARALLEL_SIMILARITY_MIN_ROWS:
+            # t1 is shipped once per worker; blocks of t rows are scored in parallel
+            with ProcessPoolExecutor(
+                max_workers=workers,
+                initializer=_init_similarity_worker,
+                initargs=(context,),
+            ) as executor:
+                edge_blocks = list(executor.map(_similarity_edges_in_worker, *blocks))
+        else:
+            edge_blocks = [_similarity_edges(context, *block) for block in zip(*blocks)]
+
+        # Greedy assignment over all candidate pairs, most similar first (ties
+        # in snapshot order), instead of letting earlier rows claim t1 methods
+        edges = [
+            (lcs_sim, i, j)
+            for block in edge_blocks
+            for lcs_sim, group_t, group_t1 in block
+            for i in groups_t[group_t]
+            for j in groups_t1[group_t1]
+        ]
+        edges.sort(key=lambda edge: (-edge[0], edge[1], edge[2]))
 
-            if best_match:
-                method_id_t1, method_t1, lcs_sim = best_match
+        matches: List[MethodMatch] = []
+        matched_t: Set[int] = set()
+        matched_t1: Set[int] = set()
+        for lcs_sim, i, j in edges:
+            if i in matched_t or j in matched_t1:
+                continue
+            matches.append(
+                self._similarity_match(methods_t[i][1], methods_t1[j][1], lcs_sim)
+            )
+            matched_t.add(i)
+            matched_t1.add(j)
 
-                if method_t.file_path == method_t1.file_path:
-                    if method_t.method_name == method_t1.method_name:
-                        match_type = "signature_changed"
-                    elif lcs_sim >= 0.90:
-                        match_type = "renamed"
-                    else:
-                        match_type = "refactored"
-                elif lcs_sim >= 0.90:
-                    match_type = "moved"
-                else:
-                    match_type = "refactored"
+        self.logger.info(f"Found {len(matches)} similarity-based matches")
+        return matches
 
-                matches.append(
-                    MethodMatch(
-                        method_t=method_t,
-                        method_t1=method_t1,
-                        match_type=match_type,
-                        similarity=lcs_sim,
-                    )
-                )
+    @staticmethod
+    def _group_identical_sequences(
+        methods: List[Tuple[int, MethodInfo]],
+    ) -> List[List[int]]:
+        """Group method indices by token sequence, in first-occurrence order."""
+        groups: Dict[Tuple[int, ...], List[int]] = {}
+        for i, (_, method) in enumerate(methods):
+            groups.setdefault(tuple(method.token_sequence), []).append(i)
+        return list(groups.values())
 
-                matched_t.add(method_id_t)
-                matched_t1.add(method_id_t1)
+    @staticmethod
+    def _similarity_match(
+        method_t: MethodInfo, method_t1: MethodInfo, lcs_sim: float
+    ) -> MethodMatch:
+        if method_t.file_path == method_t1.file_path:
+            if method_t.method_name == method_t1.method_name:
+                match_type = "signature_changed"
+            elif lcs_sim >= 0.90:
+                match_type = "renamed"
+            else:
+                match_type = "refactored"
+        elif lcs_sim >= 0.90:
+            match_type = "moved"
+        else:
+            match_type = "refactored"
 
-        self.logger.info(f"Found {len(matches)} similarity-based matches")
-        return matches
+        return MethodMatch(
+            method_t=method_t,
+            method_t1=method_t1,
+            match_type=match_type,
+            similarity=lcs_sim,
+        )
 
     def analyze_changes(
         self,
-        snapshot_t: Dict[str, MethodInfo],
-        snapshot_t1: Dict[str, MethodInfo],
-    ) -> Tuple[List[MethodMatch], Set[str], Set[str]]:
+        snapshot_t: MethodTable,
+        snapshot_t1: MethodTable,
+    ) -> Tuple[np.ndarray, List[MethodMatch], np.ndarray, np.ndarray]:
+        """Match two snapshots.
+
+        Returns the exactly matched keys (in snapshot_t order), the remaining
+        matches, and the added and deleted keys (both in snapshot order).
+        """
         all_matches: List[MethodMatch] = []
 
-        exact_matches = self.find_exact_matches(snapshot_t, snapshot_t1)
-        all_matches.extend(exact_matches)
-        self.logger.info(f"Exact matches: {len(exact_matches)}")
+        # Key sets are diffed as uint64 arrays in C; masks keep snapshot order
+        keys_t = snapshot_t.keys_array
+        keys_t1 = snapshot_t1.keys_array
+        exact_t, exact_t1 = self.find_exact_matches(snapshot_t, snapshot_t1)
 
-        matched_t = {match.method_t.full_id for match in all_matches}
-        matched_t1 = {match.method_t1.full_id for match in all_matches}
+        exact_keys = keys_t[exact_t]
+        self.logger.info(f"Exact matches: {len(exact_keys)}")
 
-        unmatched_t = {k: v for k, v in snapshot_t.items() if k not in matched_t}
-        unmatched_t1 = {k: v for k, v in snapshot_t1.items() if k not in matched_t1}
+        unmatched_keys_t = keys_t[~exact_t]
+        unmatched_keys_t1 = keys_t1[~exact_t1]
 
-        if unmatched_t and unmatched_t1:
-            token_matches = self.find_token_hash_matches(unmatched_t, unmatched_t1)
+        if len(unmatched_keys_t) and len(unmatched_keys_t1):
+            token_matches = self.find_token_hash_matches(
+                snapshot_t, snapshot_t1, unmatched_keys_t, unmatched_keys_t1
+            )
             all_matches.extend(token_matches)
             self.logger.info(f"Token hash matches: {len(token_matches)}")
 
-            for match in token_matches:
-                matched_t.add(match.method_t.full_id)
-                matched_t1.add(match.method_t1.full_id)
+            unmatched_keys_t = self._remove_keys(
+                unmatched_keys_t, [match.method_t.key for match in token_matches]
+            )
+            unmatched_keys_t1 = self._remove_keys(
+                unmatched_keys_t1, [match.method_t1.key for match in token_matches]
+            )
 
-            unmatched_t = {k: v for k, v in snapshot_t.items() if k not in matched_t}
-            unmatched_t1 = {k: v for k, v in snapshot_t1.items() if k not in matched_t1}
+        if self.use_similarity and len(unmatched_keys_t) and len(unmatched_keys_t1):
+            unmatched_t = snapshot_t.methods(unmatched_keys_t.tolist())
+            unmatched_t1 = snapshot_t1.methods(unmatched_keys_t1.tolist())
 
-        if self.use_similarity and unmatched_t and unmatched_t1:
             sim_matches = self.find_similarity_matches(unmatched_t, unmatched_t1)
             all_matches.extend(sim_matches)
 
-            for match in sim_matches:
-                matched_t.add(match.method_t.full_id)
-                matched_t1.add(match.method_t1.full_id)
+            unmatched_keys_t = self._remove_keys(
+                unmatched_keys_t, [match.method_t.key for match in sim_matches]
+            )
+            unmatched_keys_t1 = self._remove_keys(
+                unmatched_keys_t1, [match.method_t1.key for match in sim_matches]
+            )
+
+        # What is left unmatched is added (t1) or deleted (t), in snapshot order
+        return exact_keys, all_matches, unmatched_keys_t1, unmatched_keys_t
+
+    def _iter_snapshots(self, code_block_files: List[Path]) -> Iterator[MethodTable]:
+        """Yield parsed snapshots in order, parsing ahead in worker processes."""
+        workers = min(os.cpu_count() or 1, len(code_block_files))
+        files = iter(code_block_files)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque(
+                (f, executor.submit(read_code_blocks_cached, f, self.cache_dir))
+                for f in islice(files, workers)
+            )
+            while pending:
+                file_path, future = pending.popleft()
+                # Keep at most `workers` snapshots in flight to bound memory
+                for next_file in islice(files, 1):
+                    next_future = executor.submit(
+                        read_code_blocks_cached, next_file, self.cache_dir
+                    )
+                    pending.append((next_file, next_future))
+                try:
+                    methods, log_records = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to read {file_path}: {str(e)}")
+                    raise
 
-        added_ids = set(snapshot_t1.keys()) - matched_t1
-        deleted_ids = set(snapshot_t.keys()) - matched_t
+                yield self._adopt_snapshot(methods, log_records)
 
-        return all_matches, added_ids, deleted_ids
+    @staticmethod
+    def _write_details(
+        details_f: BinaryIO,
+        prev_commit: str,
+        curr_commit: str,
+        exact_hashes_t: np.ndarray,
+        exact_hashes_t1: np.ndarray,
+        matches: List[MethodMatch],
+        added_hashes: np.ndarray,
+        deleted_hashes: np.ndarray,
+    ) -> None:
+        """Write one snapshot pair's details rows (runs on the writer thread)."""
+        # Snapshot names may fall back to raw directory names, so quote them
+        # like csv.writer would; the prefix is shared by every row of the pair
+        prefix_buf = io.StringIO()
+        csv.writer(prefix_buf, lineterminator="").writerow(
+            [prev_commit, curr_commit, ""]
+        )
+        prefix = prefix_buf.getvalue()
+        eol = DETAILS_LINE_TERMINATOR
+        details_f.write(
+            "".join(
+                f"{prefix}exact,{token_hash_t},{token_hash_t1},1.000{eol}"
+                for token_hash_t, token_hash_t1 in zip(exact_hashes_t, exact_hashes_t1)
+            ).encode("utf-8")
+        )
+        details_f.write(
+            "".join(
+                f"{prefix}{match.match_type},{match.method_t.token_hash},"
+                f"{match.method_t1.token_hash},{match.similarity:.3f}{eol}"
+                for match in matches
+            ).encode("utf-8")
+        )
+        details_f.write(
+            "".join(
+                f"{prefix}added,,{token_hash},{eol}" for token_hash in added_hashes
+            ).encode("utf-8")
+        )
+        details_f.write(
+            "".join(
+                f"{prefix}deleted,{token_hash},,{eol}" for token_hash in deleted_hashes
+            ).encode("utf-8")
+        )
 
     def track_methods(
         self,
@@ -423,13 +934,14 @@ class MethodTracker:
         summary_filename: str = "method_tracking_summary.csv",
         details_filename: str = "method_tracking_details.csv",
     ) -> None:
-        snapshot_dirs = sorted(
-            [
-                d
-                for d in code_blocks_dir.iterdir()
-                if d.is_dir() and (d / code_block_filename).exists()
-            ]
-        )
+        # DirEntry.is_dir() uses the type returned by readdir, saving a stat
+        with os.scandir(code_blocks_dir) as entries:
+            snapshot_dirs = sorted(
+                Path(entry.path)
+                for entry in entries
+                if entry.is_dir()
+                and os.path.exists(os.path.join(entry.path, code_block_filename))
+            )
 
         code_block_files = [d / code_block_filename for d in snapshot_dirs]
         if code_block_files:
@@ -456,10 +968,10 @@ class MethodTracker:
 
         with (
             open(summary_path, "w", newline="", encoding="utf-8") as summary_f,
-            open(details_path, "w", newline="", encoding="utf-8") as details_f,
+            open(details_path, "wb", buffering=OUTPUT_BUFFER_SIZE) as details_f,
+            ThreadPoolExecutor(max_workers=1) as writer,
         ):
             summary_writer = csv.writer(summary_f)
-            details_writer = csv.writer(details_f)
 
             summary_writer.writerow(
                 [
@@ -478,22 +990,31 @@ class MethodTracker:
                 ]
             )
 
-            details_writer.writerow(
-                [
-                    "snapshot_t",
-                    "snapshot_t1",
-                    "change_type",
-                    "method_t",
-                    "method_t1",
-                    "similarity",
-                ]
+            # Apart from the snapshot names (quoted once per pair in
+            # _write_details), details fields are hex hashes, change types
+            # and numbers, so rows are joined directly without csv quoting.
+            details_header = [
+                "snapshot_t",
+                "snapshot_t1",
+                "change_type",
+                "method_t",
+                "method_t1",
+                "similarity",
+            ]
+            details_f.write(
+                (",".join(details_header) + DETAILS_LINE_TERMINATOR).encode("utf-8")
             )
 
             prev_file = None
             prev_snapshot = None
+            pending_write = None
 
-            for curr_file in tqdm(code_block_files, desc="Tracking methods"):
-                curr_snapshot = self.parse_code_blocks(curr_file)
+            snapshots = self._iter_snapshots(code_block_files)
+            for curr_file, curr_snapshot in tqdm(
+                zip(code_block_files, snapshots),
+                total=len(code_block_files),
+                desc="Tracking methods",
+            ):
 
                 dir_name = curr_file.parent.name
                 parts = dir_name.split("_")
@@ -516,12 +1037,13 @@ class MethodTracker:
                             f"Unexpected snapshot dir name format: {prev_dir_name}"
                         )
 
-                    matches, added_ids, deleted_ids = self.analyze_changes(
+                    exact_keys, matches, added_ids, deleted_ids = self.analyze_changes(
                         prev_snapshot, curr_snapshot
                     )
+                    exact_keys = exact_keys.tolist()
 
                     match_counts = {
-                        "exact": 0,
+                        "exact": len(exact_keys),
                         "token_hash": 0,
                         "renamed": 0,
                         "moved": 0,
@@ -550,43 +1072,21 @@ class MethodTracker:
                         ]
                     )
 
-                    for match in matches:
-                        details_writer.writerow(
-                            [
-                                prev_commit,
-                                curr_commit,
-                                match.match_type,
-                                getattr(match.method_t, "token_hash", ""),
-                                getattr(match.method_t1, "token_hash", ""),
-                                f"{match.similarity:.3f}",
-                            ]
-                        )
-
-                    for method_id in added_ids:
-                        method = curr_snapshot[method_id]
-                        details_writer.writerow(
-                            [
-                                prev_commit,
-                                curr_commit,
-                                "added",
-                                "",
-                                getattr(method, "token_hash", ""),
-                                "",
-                            ]
-                        )
-
-                    for method_id in deleted_ids:
-                        method = prev_snapshot[method_id]
-                        details_writer.writerow(
-                            [
-                                prev_commit,
-                                curr_commit,
-                                "deleted",
-                                getattr(method, "token_hash", ""),
-                                "",
-                                "",
-                            ]
-                        )
+                    # Hand the details rows to the writer thread; waiting on the
+                    # previous write keeps at most one pair queued in memory.
+                    if pending_write is not None:
+                        pending_write.result()
+                    pending_write = writer.submit(
+                        self._write_details,
+                        details_f,
+                        prev_commit,
+                        curr_commit,
+                        prev_snapshot.column("token_hash", exact_keys),
+                        curr_snapshot.column("token_hash", exact_keys),
+                        matches,
+                        curr_snapshot.column("token_hash", added_ids.tolist()),
+                        prev_snapshot.column("token_hash", deleted_ids.tolist()),
+                    )
 
                     self.logger.info(
                         f"{prev_commit} -> {curr_commit}: exact={match_counts['exact']}, token_hash={match_counts['token_hash']}, renamed={match_counts['renamed']}, moved={match_counts['moved']}, sig_changed={match_counts['signature_changed']}, refactored={match_counts['refactored']}, added={len(added_ids)}, deleted={len(deleted_ids)}"
@@ -595,6 +1095,9 @@ class MethodTracker:
                 prev_file = curr_file
                 prev_snapshot = curr_snapshot
 
+            if pending_write is not None:
+                pending_write.result()
+
         self.logger.info(f"Summary written to {summary_path}")
         self.logger.info(f"Details written to {details_path}")
         self.logger.info("Method tracking complete!")
@@ -637,6 +1140,11 @@ def main() -> None:
         help="Output CSV filename for method tracking details (default: method_tracking_details.csv)",
     )
     parser.add_argument("--log", type=Path, help="Log file path (optional)")
+    parser.add_argument(
+        "--cache-dir",
+        type=Path,
+        help="Directory for cached parsed snapshots, reused while code_blocks files are unchanged (optional)",
+    )
     parser.add_argument(
         "--use-similarity",
         action="store_true",
@@ -663,6 +1171,7 @@ def main() -> None:
         use_similarity=args.use_similarity,
         ngram_threshold=args.ngram_threshold,
         lcs_threshold=args.lcs_threshold,
+        cache_dir=args.cache_dir,
     )
     tracker.logger.info(f"Input directory: {args.input_dir}")
     tracker.logger.info(f"Output directory: {args.output_dir}")
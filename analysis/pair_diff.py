@@ -9,19 +9,34 @@ the differences (added, deleted, persisted) between adjacent snapshots.
 import argparse
 import csv
 import logging
+import os
 import re
 import sys
-from dataclasses import dataclass
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
 from datetime import datetime
+from itertools import islice
 from pathlib import Path
-from typing import List, Set, Tuple
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
 
+from parse_cache import file_stamp, load_cached, store_cached
 from tqdm import tqdm
 
+# Timestamp embedded in snapshot file names: results_YYYYMMDD_HHMMSS_*.csv
+SNAPSHOT_TIMESTAMP_RE = re.compile(r"results_(\d{8})_(\d{6})_")
+# Any whitespace; rows without it have nothing to strip
+WHITESPACE_RE = re.compile(r"\s")
+# Output buffer size; pair lists run to millions of rows
+WRITE_BUFFER_SIZE = 1 << 20
+# Bumped whenever the pickled read_snapshot_rows() result changes layout
+PARSE_CACHE_VERSION = 2
 
-@dataclass(frozen=True, order=True)
-class MethodID:
-    """Represents a method identifier (path, method, args, ret)."""
+
+class MethodID(NamedTuple):
+    """Represents a method identifier (path, method, args, ret).
+
+    A tuple, so construction, hashing and ordering run in C.
+    """
 
     path: str
     method: str
@@ -36,11 +51,144 @@ class MethodID:
 PairKey = Tuple[MethodID, MethodID]
 
 
+def _iter_csv_rows(data: str) -> Iterator[Tuple[List[str], bool]]:
+    """
+    Yield (row, may_need_strip) for each CSV record in data.
+
+    Lines without quotes are plain comma-separated and are split directly.
+    A line with an odd number of quotes may open a field that spans lines,
+    so it and the rest of the text go through one csv.reader.
+    """
+    lines = data.split("\n")
+    for i, line in enumerate(lines):
+        if '"' not in line:
+            yield line.split(","), WHITESPACE_RE.search(line) is not None
+        elif line.count('"') % 2 == 0:
+            yield next(csv.reader([line]), []), WHITESPACE_RE.search(line) is not None
+        else:
+            for row in csv.reader(rest + "\n" for rest in islice(lines, i, None)):
+                yield row, True
+            return
+
+
+def read_snapshot_rows(
+    csv_path: Path,
+) -> Tuple[Set[Tuple[str, ...]], List[Tuple[int, str]]]:
+    """
+    Parse a snapshot CSV into normalized pair rows plus log records.
+
+    Each pair is returned as one flat tuple (path, method, args, ret of A,
+    then of B, with A <= B), which pickles much faster than MethodID pairs
+    when this runs in a worker process. Log records are returned as
+    (level, message) for the caller to emit.
+    """
+    pairs = set()
+    log_records: List[Tuple[int, str]] = []
+    error_count = 0
+
+    # Read the whole file at once; rows without quotes are plain
+    # comma-separated, so only quoted rows go through csv.reader
+    data = csv_path.read_text(encoding="utf-8")
+    # Paths and names repeat across rows and snapshots; interned
+    # strings are shared and compare by identity in set lookups
+    intern = sys.intern
+    for line_num, (row, may_need_strip) in enumerate(_iter_csv_rows(data), 1):
+        # Skip empty lines
+        if not row or all(cell.strip() == "" for cell in row):
+            continue
+
+        # Check column count
+        if len(row) != 12:
+            error_count += 1
+            log_records.append(
+                (
+                    logging.WARNING,
+                    f"{csv_path.name}:{line_num}: Expected 12 columns, got {len(row)}",
+                )
+            )
+            continue
+
+        try:
+            # Trim whitespace, but only on the (rare) rows that have any
+            if may_need_strip:
+                row = [cell.strip() for cell in row]
+
+            # Extract columns
+            (
+                path_a,
+                start_a,
+                end_a,
+                method_a,
+                ret_a,
+                args_a,
+                path_b,
+                start_b,
+                end_b,
+                method_b,
+                ret_b,
+                args_b,
+            ) = row
+
+            # Method IDs (ignoring start/end)
+            m_a = (intern(path_a), intern(method_a), intern(args_a), intern(ret_a))
+            m_b = (intern(path_b), intern(method_b), intern(args_b), intern(ret_b))
+
+            # Normalized pair (undirected), flattened into one tuple
+            pairs.add(m_a + m_b if m_a <= m_b else m_b + m_a)
+
+        except Exception as e:
+            error_count += 1
+            log_records.append(
+                (
+                    logging.WARNING,
+                    f"{csv_path.name}:{line_num}: Error parsing row - {str(e)}",
+                )
+            )
+            continue
+
+    if error_count > 0:
+        log_records.append(
+            (
+                logging.WARNING,
+                f"{csv_path.name}: Parsed with {error_count} errors, "
+                f"{len(pairs)} unique pairs extracted",
+            )
+        )
+    else:
+        log_records.append(
+            (logging.INFO, f"{csv_path.name}: {len(pairs)} unique pairs extracted")
+        )
+
+    return pairs, log_records
+
+
+def read_snapshot_rows_cached(
+    csv_path: Path, cache_dir: Optional[Path]
+) -> Tuple[Set[Tuple[str, ...]], List[Tuple[int, str]]]:
+    """read_snapshot_rows() through an on-disk cache keyed by file mtime and size."""
+    if cache_dir is None:
+        return read_snapshot_rows(csv_path)
+
+    stamp = file_stamp(csv_path, PARSE_CACHE_VERSION)
+    cache_path = cache_dir / f"{csv_path.stem}.pkl"
+    result = load_cached(cache_path, stamp)
+    if result is not None:
+        return result
+
+    pairs, log_records = read_snapshot_rows(csv_path)
+    error = store_cached(cache_path, stamp, (pairs, log_records))
+    if error is not None:
+        log_records = log_records + [
+            (logging.WARNING, f"Failed to write parse cache {cache_path}: {error}")
+        ]
+    return pairs, log_records
+
+
 class PairDiffAnalyzer:
     """Analyzes differences in method pairs between adjacent snapshots."""
 
-    def __init__(self, log_file: Path = None):
-        """Initialize the analyzer with optional log file."""
+    def __init__(self, log_file: Path = None, cache_dir: Optional[Path] = None):
+        """Initialize the analyzer with optional log file and parse cache dir."""
         # Setup logging
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
@@ -70,13 +218,14 @@ class PairDiffAnalyzer:
         self.logger.addHandler(file_handler)
         self.logger.addHandler(console_handler)
         self.log_file = log_file
+        self.cache_dir = cache_dir
 
     def extract_timestamp_from_filename(self, filename: str) -> Tuple[str, str] | None:
         """
         Extract timestamp from filename pattern: results_YYYYMMDD_HHMMSS_*.csv
         Returns (date_str, time_str) or None if pattern doesn't match.
         """
-        match = re.search(r"results_(\d{8})_(\d{6})_", filename)
+        match = SNAPSHOT_TIMESTAMP_RE.search(filename)
         if match:
             return match.group(1), match.group(2)
         return None
@@ -122,92 +271,73 @@ class PairDiffAnalyzer:
         path_b, start_b, end_b, method_b, ret_b, args_b
 
         Method ID = (path, method, args, ret) - ignoring start/end
-        Pair key = tuple(sorted([M_a, M_b])) for undirected pairs
+        Pair key = (M_a, M_b) in sorted order, for undirected pairs
         """
-        pairs = set()
-        error_count = 0
-
         try:
-            with open(csv_path, "r", encoding="utf-8") as f:
-                reader = csv.reader(f)
-                for line_num, row in enumerate(reader, 1):
-                    # Skip empty lines
-                    if not row or all(cell.strip() == "" for cell in row):
-                        continue
-
-                    # Check column count
-                    if len(row) != 12:
-                        error_count += 1
-                        self.logger.warning(
-                            f"{csv_path.name}:{line_num}: Expected 12 columns, got {len(row)}"
-                        )
-                        continue
-
-                    try:
-                        # Extract columns
-                        (
-                            path_a,
-                            start_a,
-                            end_a,
-                            method_a,
-                            ret_a,
-                            args_a,
-                            path_b,
-                            start_b,
-                            end_b,
-                            method_b,
-                            ret_b,
-                            args_b,
-                        ) = row
-
-                        # Create Method IDs (ignoring start/end, trimming whitespace)
-                        m_a = MethodID(
-                            path=path_a.strip(),
-                            method=method_a.strip(),
-                            args=args_a.strip(),
-                            ret=ret_a.strip(),
-                        )
-
-                        m_b = MethodID(
-                            path=path_b.strip(),
-                            method=method_b.strip(),
-                            args=args_b.strip(),
-                            ret=ret_b.strip(),
-                        )
-
-                        # Create normalized pair key (undirected)
-                        pair_key = tuple(sorted([m_a, m_b]))
-                        pairs.add(pair_key)
-
-                    except Exception as e:
-                        error_count += 1
-                        self.logger.warning(
-                            f"{csv_path.name}:{line_num}: Error parsing row - {str(e)}"
-                        )
-                        continue
-
+            rows, log_records = read_snapshot_rows_cached(csv_path, self.cache_dir)
         except Exception as e:
             self.logger.error(f"Failed to read {csv_path}: {str(e)}")
             raise
+        return self._pairs_from_rows(rows, log_records)
+
+    def _pairs_from_rows(
+        self, rows: Set[Tuple[str, ...]], log_records: List[Tuple[int, str]]
+    ) -> Set[PairKey]:
+        """Replay read_snapshot_rows() log records and build the pair keys."""
+        for level, message in log_records:
+            self.logger.log(level, message)
+        MID = MethodID
+        # Rows unpickled from a worker carry fresh string copies; intern them
+        # here so equal strings are shared across snapshots in this process
+        intern = sys.intern
+        return {
+            (MID(*map(intern, row[:4])), MID(*map(intern, row[4:]))) for row in rows
+        }
+
+    def _iter_snapshots(self, snapshot_files: List[Path]) -> Iterator[Set[PairKey]]:
+        """Yield parsed snapshots in order, parsing ahead in worker processes."""
+        workers = min(os.cpu_count() or 1, len(snapshot_files))
+        if workers == 1:
+            # Nothing to overlap with; skip the pickling round trip
+            for csv_path in snapshot_files:
+                yield self.parse_snapshot(csv_path)
+            return
 
-        if error_count > 0:
-            self.logger.warning(
-                f"{csv_path.name}: Parsed with {error_count} errors, "
-                f"{len(pairs)} unique pairs extracted"
+        files = iter(snapshot_files)
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            pending = deque(
+                (f, executor.submit(read_snapshot_rows_cached, f, self.cache_dir))
+                for f in islice(files, workers)
             )
-        else:
-            self.logger.info(f"{csv_path.name}: {len(pairs)} unique pairs extracted")
-
-        return pairs
-
-    def write_pair_list(self, pairs: Set[PairKey], output_path: Path) -> None:
+            while pending:
+                csv_path, future = pending.popleft()
+                # Keep at most `workers` snapshots in flight to bound memory
+                for next_file in islice(files, 1):
+                    next_future = executor.submit(
+                        read_snapshot_rows_cached, next_file, self.cache_dir
+                    )
+                    pending.append((next_file, next_future))
+                try:
+                    rows, log_records = future.result()
+                except Exception as e:
+                    self.logger.error(f"Failed to read {csv_path}: {str(e)}")
+                    raise
+                yield self._pairs_from_rows(rows, log_records)
+
+    def write_pair_list(self, pairs: Iterable[PairKey], output_path: Path) -> None:
         """
         Write a set of pairs to a CSV file.
         Columns: A_path, A_method, A_args, A_ret, B_path, B_method, B_args, B_ret
         """
         output_path.parent.mkdir(parents=True, exist_ok=True)
 
-        with open(output_path, "w", newline="", encoding="utf-8") as f:
+        with open(
+            output_path,
+            "w",
+            newline="",
+            encoding="utf-8",
+            buffering=WRITE_BUFFER_SIZE,
+        ) as f:
             writer = csv.writer(f)
             # Write header
             writer.writerow(
@@ -239,7 +369,11 @@ class PairDiffAnalyzer:
                 )
 
     def analyze_snapshots(
-        self, input_dir: Path, output_dir: Path, emit_lists: bool = False
+        self,
+        input_dir: Path,
+        output_dir: Path,
+        emit_lists: bool = False,
+        progress: bool = True,
     ) -> None:
         """
         Analyze all snapshots in the input directory and compute differences
@@ -257,7 +391,13 @@ class PairDiffAnalyzer:
 
         # Open summary CSV file
         summary_path = output_dir / "pair_diff_summary.csv"
-        with open(summary_path, "w", newline="", encoding="utf-8") as summary_file:
+        with open(
+            summary_path,
+            "w",
+            newline="",
+            encoding="utf-8",
+            buffering=WRITE_BUFFER_SIZE,
+        ) as summary_file:
             summary_writer = csv.writer(summary_file)
             summary_writer.writerow(
                 [
@@ -277,23 +417,24 @@ class PairDiffAnalyzer:
             prev_set = None
             prev_file = None
 
-            for i, curr_file in enumerate(
-                tqdm(snapshot_files, desc="Processing snapshots")
+            snapshots = self._iter_snapshots(snapshot_files)
+            for curr_file, curr_set in tqdm(
+                zip(snapshot_files, snapshots),
+                total=len(snapshot_files),
+                desc="Processing snapshots",
+                disable=not progress,
+                mininterval=5.0,
+                smoothing=0.1,
             ):
-                # Parse current snapshot
-                curr_set = self.parse_snapshot(curr_file)
 
                 # Compare with previous snapshot if available
                 if prev_set is not None:
-                    # Compute differences
+                    # Calculate counts; only the added set is materialized, and
+                    # persisted/deleted follow from it without further set ops
                     added = curr_set - prev_set
-                    deleted = prev_set - curr_set
-                    persisted = prev_set & curr_set
-
-                    # Calculate counts
                     added_count = len(added)
-                    deleted_count = len(deleted)
-                    persisted_count = len(persisted)
+                    persisted_count = len(curr_set) - added_count
+                    deleted_count = len(prev_set) - persisted_count
                     total = added_count + deleted_count + persisted_count
 
                     # Calculate rates (avoid division by zero)
@@ -337,16 +478,21 @@ class PairDiffAnalyzer:
                             output_dir / f"{prev_basename}_to_{curr_basename}"
                         )
 
+                        # Reuse the added set; build the others one at a time
                         self.write_pair_list(added, transition_dir / "added.csv")
-                        self.write_pair_list(deleted, transition_dir / "deleted.csv")
                         self.write_pair_list(
-                            persisted, transition_dir / "persisted.csv"
+                            prev_set - curr_set, transition_dir / "deleted.csv"
+                        )
+                        self.write_pair_list(
+                            prev_set & curr_set, transition_dir / "persisted.csv"
                         )
 
                         self.logger.info(
                             f"  Detailed lists written to {transition_dir}"
                         )
 
+                    added = None
+
                 # Move to next iteration
                 prev_set = curr_set
                 prev_file = curr_file
@@ -384,6 +530,17 @@ def main():
         type=str,
         help="Log file path (default: logs/pair_diff_TIMESTAMP.log)",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Directory for cached parsed snapshots, reused while the CSV files are unchanged (optional)",
+    )
+    parser.add_argument(
+        "--progress",
+        action=argparse.BooleanOptionalAction,
+        default=True,
+        help="Show a progress bar while processing snapshots (default: on)",
+    )
 
     args = parser.parse_args()
 
@@ -391,6 +548,7 @@ def main():
     input_dir = Path(args.input_dir)
     output_dir = Path(args.output_dir)
     log_path = Path(args.log) if args.log else None
+    cache_dir = Path(args.cache_dir) if args.cache_dir else None
 
     # Ensure log directory exists
     if log_path:
@@ -405,11 +563,14 @@ def main():
             sys.exit(1)
 
         # Create analyzer
-        analyzer = PairDiffAnalyzer(log_file=log_path)
+        analyzer = PairDiffAnalyzer(log_file=log_path, cache_dir=cache_dir)
 
         # Run analysis
         analyzer.analyze_snapshots(
-            input_dir=input_dir, output_dir=output_dir, emit_lists=args.emit_lists
+            input_dir=input_dir,
+            output_dir=output_dir,
+            emit_lists=args.emit_lists,
+            progress=args.progress,
         )
 
     except KeyboardInterrupt:
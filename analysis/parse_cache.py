@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""
+Parse Cache
+
+On-disk cache of parsed input files, shared by the analysis scripts. Each
+entry is a pickle of (stamp, value), where the stamp combines a format
+version with the input file's mtime and size; a cached value is only used
+while the stamp still matches.
+"""
+
+import pickle
+from pathlib import Path
+from typing import Any, Optional, Tuple
+
+
+def file_stamp(file_path: Path, version: int) -> Tuple[int, int, int]:
+    """Return the cache stamp of file_path under the given format version."""
+    stat = file_path.stat()
+    return (version, stat.st_mtime_ns, stat.st_size)
+
+
+def load_cached(cache_path: Path, stamp: Tuple[int, int, int]) -> Optional[Any]:
+    """Return the value cached at cache_path, or None if it is missing or stale."""
+    try:
+        with open(cache_path, "rb") as f:
+            cached_stamp, value = pickle.load(f)
+    except Exception:
+        # Missing, stale-format or truncated cache: the caller parses again
+        return None
+    return value if cached_stamp == stamp else None
+
+
+def store_cached(
+    cache_path: Path, stamp: Tuple[int, int, int], value: Any
+) -> Optional[OSError]:
+    """Write value to cache_path atomically.
+
+    Returns the error instead of raising when the cache cannot be written,
+    so callers can report it and carry on with the value they already have.
+    """
+    tmp_path = cache_path.with_suffix(".tmp")
+    try:
+        cache_path.parent.mkdir(parents=True, exist_ok=True)
+        with open(tmp_path, "wb") as f:
+            pickle.dump((stamp, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        tmp_path.replace(cache_path)
+    except OSError as e:
+        return e
+    return None
@@ -5,7 +5,22 @@ Similarity Calculator
 Implements N-gram and LCS similarity calculation using the same algorithms as NIL.
 """
 
-from typing import List, Set
+from collections import Counter
+from itertools import chain
+from typing import List, NamedTuple, Sequence, Tuple, Union
+
+import numpy as np
+
+# Multiplier of the polynomial rolling hash used for N-gram hashing (mod 2**64)
+NGRAM_HASH_BASE = np.uint64(1000003)
+
+
+class NgramIndex(NamedTuple):
+    """Inverted N-gram index of a method group: sorted hashes and their owners."""
+
+    hashes: np.ndarray
+    owners: np.ndarray
+    sizes: np.ndarray
 
 
 class SimilarityCalculator:
@@ -34,19 +49,134 @@ class SimilarityCalculator:
         Returns:
             Similarity percentage (0-100)
         """
-        if not tokens_a or not tokens_b:
+        if len(tokens_a) == 0 or len(tokens_b) == 0:
             return 0
 
-        ngrams_a = self._create_ngrams(tokens_a)
-        ngrams_b = self._create_ngrams(tokens_b)
+        return self.calc_ngram_similarity_from_hashes(
+            self.ngram_hashes(tokens_a), self.ngram_hashes(tokens_b)
+        )
 
-        if not ngrams_a or not ngrams_b:
-            return 0
+    def calc_ngram_similarity_from_hashes(
+        self, ngrams_a: np.ndarray, ngrams_b: np.ndarray
+    ) -> int:
+        """
+        Calculate N-gram similarity from precomputed ngram_hashes() arrays.
+
+        Lets callers hash each sequence once and compare it many times.
+
+        Args:
+            ngrams_a: Distinct N-gram hashes of the first sequence
+            ngrams_b: Distinct N-gram hashes of the second sequence
 
-        intersection = len(ngrams_a & ngrams_b)
+        Returns:
+            Similarity percentage (0-100)
+        """
         min_size = min(len(ngrams_a), len(ngrams_b))
+        if min_size == 0:
+            return 0
 
-        return (intersection * 100) // min_size if min_size > 0 else 0
+        intersection = np.intersect1d(ngrams_a, ngrams_b, assume_unique=True).size
+        return (intersection * 100) // min_size
+
+    def build_ngram_index(self, ngrams: List[np.ndarray]) -> NgramIndex:
+        """
+        Build the inverted N-gram index of a method group.
+
+        Building it once lets calc_ngram_similarity_pairs() reuse it for
+        every block of rows compared against the same group.
+
+        Args:
+            ngrams: ngram_hashes() arrays of the group's methods
+
+        Returns:
+            Hashes sorted for binary search, with the owning method index of
+            each hash and the N-gram count of each method
+        """
+        sizes = np.array([len(g) for g in ngrams], dtype=np.int64)
+        if len(ngrams) == 0:
+            return NgramIndex(np.empty(0, dtype=np.uint64), sizes, sizes)
+
+        flat = np.concatenate(ngrams)
+        owners = np.repeat(np.arange(len(ngrams)), sizes)
+        order = np.argsort(flat, kind="stable")
+        return NgramIndex(flat[order], owners[order], sizes)
+
+    def calc_ngram_similarity_pairs(
+        self,
+        ngrams_a: List[np.ndarray],
+        ngrams_b: Union[List[np.ndarray], NgramIndex],
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Calculate N-gram similarity for the pairs of two method groups that
+        share at least one N-gram.
+
+        Instead of intersecting every pair separately, each N-gram of group A
+        is looked up in the inverted index of group B and the hits are counted
+        per (a, b) pair. Only pairs with hits are materialized, so memory
+        grows with the number of hits rather than with N x M.
+
+        Args:
+            ngrams_a: ngram_hashes() arrays of the first group (N methods)
+            ngrams_b: ngram_hashes() arrays of the second group (M methods),
+                or their build_ngram_index()
+
+        Returns:
+            Row indices into A, column indices into B (sorted by row, then
+            column) and the similarity percentage (0-100) of each pair; every
+            pair not listed has similarity 0
+        """
+        index = ngrams_b
+        if not isinstance(index, NgramIndex):
+            index = self.build_ngram_index(ngrams_b)
+
+        n, m = len(ngrams_a), len(index.sizes)
+        if n == 0 or m == 0:
+            empty = np.empty(0, dtype=np.int64)
+            return empty, empty, empty
+
+        sizes_a = np.array([len(g) for g in ngrams_a], dtype=np.int64)
+        flat_a = np.concatenate(ngrams_a)
+        owners_a = np.repeat(np.arange(n), sizes_a)
+
+        # Every A-gram matches a contiguous run of equal hashes in the index
+        lo = np.searchsorted(index.hashes, flat_a, side="left")
+        counts = np.searchsorted(index.hashes, flat_a, side="right") - lo
+        total = int(counts.sum())
+        run_starts = np.repeat(lo - (np.cumsum(counts) - counts), counts)
+        cols = index.owners[run_starts + np.arange(total)]
+        rows = np.repeat(owners_a, counts)
+
+        # Each hit is one shared N-gram of its (a, b) pair
+        pair_keys, intersection = np.unique(rows * m + cols, return_counts=True)
+        rows, cols = np.divmod(pair_keys, m)
+        # Pairs sharing an N-gram both have at least one, so min_size > 0
+        min_size = np.minimum(sizes_a[rows], index.sizes[cols])
+        return rows, cols, (intersection * 100) // min_size
+
+    def calc_ngram_similarity_matrix(
+        self,
+        ngrams_a: List[np.ndarray],
+        ngrams_b: Union[List[np.ndarray], NgramIndex],
+    ) -> np.ndarray:
+        """
+        Calculate N-gram similarity for all pairs of two method groups at once.
+
+        Dense form of calc_ngram_similarity_pairs(); prefer that for large
+        groups.
+
+        Args:
+            ngrams_a: ngram_hashes() arrays of the first group (N methods)
+            ngrams_b: ngram_hashes() arrays of the second group (M methods),
+                or their build_ngram_index()
+
+        Returns:
+            N x M array of similarity percentages (0-100)
+        """
+        m = len(ngrams_b.sizes if isinstance(ngrams_b, NgramIndex) else ngrams_b)
+        rows, cols, sims = self.calc_ngram_similarity_pairs(ngrams_a, ngrams_b)
+        matrix = np.zeros((len(ngrams_a), m), dtype=np.int64)
+        matrix[rows, cols] = sims
+        return matrix
 
     def calc_lcs_similarity(self, tokens_a: List[int], tokens_b: List[int]) -> int:
         """
@@ -55,7 +185,7 @@ class SimilarityCalculator:
         This implements the same algorithm as NIL's LCSBasedVerification:
         similarity = lcs_length * 100 / min(len(a), len(b))
 
-        Uses Hunt-Szymanski algorithm for O(N log N) complexity.
+        Uses a bit-parallel LCS that advances one machine word per step.
 
         Args:
             tokens_a: First token sequence
@@ -67,35 +197,141 @@ class SimilarityCalculator:
         if not tokens_a or not tokens_b:
             return 0
 
-        lcs_length = self._hunt_szymanski_lcs(tokens_a, tokens_b)
+        lcs_length = self._bit_parallel_lcs(tokens_a, tokens_b)
         min_len = min(len(tokens_a), len(tokens_b))
 
         return (lcs_length * 100) // min_len if min_len > 0 else 0
 
-    def _create_ngrams(self, tokens: List[int]) -> Set[int]:
+    def calc_lcs_similarity_bound(self, counts_a: Counter, counts_b: Counter) -> int:
         """
-        Create a distinct set of N-gram hashes from token sequence.
+        Calculate an upper bound of calc_lcs_similarity() without running LCS.
+
+        An LCS cannot use a token more often than it occurs in either sequence,
+        so the multiset intersection size bounds the LCS length.
+
+        Args:
+            counts_a: Token counts of the first sequence
+            counts_b: Token counts of the second sequence
+
+        Returns:
+            Upper bound of the LCS similarity percentage (0-100)
+        """
+        min_len = min(counts_a.total(), counts_b.total())
+        if min_len == 0:
+            return 0
+
+        common = (counts_a & counts_b).total()
+        return (common * 100) // min_len
+
+    def ngram_hashes(self, tokens: Sequence[int]) -> np.ndarray:
+        """
+        Create the distinct N-gram hashes of a token sequence.
 
         This implements the same logic as NIL's TokenSequence.toNgrams():
         - Extract N-grams of size gram_size
-        - Hash each N-gram using Python's hash()
-        - Return distinct set
+        - Hash each N-gram (polynomial rolling hash over uint64, vectorized)
+        - Return distinct set, as a sorted uint64 array
 
         Args:
-            tokens: Token sequence
+            tokens: Token sequence (list or integer array)
 
         Returns:
-            Set of N-gram hashes
+            Sorted array of distinct N-gram hashes
         """
         if len(tokens) < self.gram_size:
-            return set()
+            return np.empty(0, dtype=np.uint64)
+
+        # int64 -> uint64 wraps negative tokens, which is fine for hashing
+        values = np.asarray(tokens, dtype=np.int64).astype(np.uint64)
+        windows = np.lib.stride_tricks.sliding_window_view(values, self.gram_size)
+        hashes = np.zeros(len(windows), dtype=np.uint64)
+        for k in range(self.gram_size):
+            hashes = hashes * NGRAM_HASH_BASE + windows[:, k]
+
+        return np.unique(hashes)
+
+    def ngram_hashes_many(self, sequences: List[Sequence[int]]) -> List[np.ndarray]:
+        """
+        Create the distinct N-gram hashes of many token sequences at once.
+
+        The sequences are laid out as one flat token buffer with offsets, so
+        hashing and de-duplication run as a few whole-buffer numpy passes
+        instead of one small pass per sequence.
+
+        Args:
+            sequences: Token sequences
+
+        Returns:
+            Per sequence, the sorted array of distinct N-gram hashes
+            (same as ngram_hashes())
+        """
+        lengths = np.fromiter(map(len, sequences), dtype=np.int64, count=len(sequences))
+        counts = np.maximum(lengths - self.gram_size + 1, 0)
+        total = int(counts.sum())
+        if total == 0:
+            return [np.empty(0, dtype=np.uint64) for _ in sequences]
+
+        tokens = np.fromiter(
+            chain.from_iterable(sequences), dtype=np.int64, count=int(lengths.sum())
+        ).astype(np.uint64)
+        windows = np.lib.stride_tricks.sliding_window_view(tokens, self.gram_size)
+        offsets = np.cumsum(lengths) - lengths
+
+        # Start position of every N-gram that lies inside a single sequence
+        rows = np.repeat(np.arange(len(sequences)), counts)
+        first = np.cumsum(counts) - counts
+        positions = np.arange(total) - first[rows] + offsets[rows]
+
+        hashes = np.zeros(total, dtype=np.uint64)
+        for k in range(self.gram_size):
+            hashes = hashes * NGRAM_HASH_BASE + windows[positions, k]
+
+        # Sort within each sequence and keep the first of every run of equals
+        order = np.lexsort((hashes, rows))
+        hashes = hashes[order]
+        keep = np.ones(total, dtype=bool)
+        keep[1:] = (hashes[1:] != hashes[:-1]) | (rows[1:] != rows[:-1])
+        distinct = np.bincount(rows[keep], minlength=len(sequences))
+        return np.split(hashes[keep], np.cumsum(distinct)[:-1])
+
+    def _bit_parallel_lcs(self, a: Sequence[int], b: Sequence[int]) -> int:
+        """
+        Calculate LCS length with the bit-parallel algorithm of Allison-Dix/Hyyro.
+
+        Each row of the LCS table is kept as a bit vector over the longer
+        sequence (a Python int, processed one machine word at a time), so a
+        token of the shorter sequence costs a few word operations instead of
+        one step per cell. Returns the same length as _hunt_szymanski_lcs().
+
+        Args:
+            a: First token sequence
+            b: Second token sequence
 
-        ngrams = set()
-        for i in range(len(tokens) - self.gram_size + 1):
-            ngram = tuple(tokens[i : i + self.gram_size])
-            ngrams.add(hash(ngram))
+        Returns:
+            Length of LCS
+        """
+        if len(a) < len(b):
+            shorter, longer = a, b
+        else:
+            shorter, longer = b, a
+
+        m = len(longer)
+        if len(shorter) == 0 or m == 0:
+            return 0
+
+        # token -> bit mask of its positions in the longer sequence
+        match_masks = {}
+        for i, token in enumerate(longer):
+            match_masks[token] = match_masks.get(token, 0) | (1 << i)
+
+        full = (1 << m) - 1
+        v = full
+        for token in shorter:
+            u = v & match_masks.get(token, 0)
+            v = ((v + u) | (v - u)) & full
 
-        return ngrams
+        # Cleared bits mark the positions that end an LCS row increment
+        return m - v.bit_count()
 
     def _hunt_szymanski_lcs(self, a: List[int], b: List[int]) -> int:
         """
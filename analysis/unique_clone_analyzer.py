@@ -9,17 +9,36 @@ When a pair appears multiple times, it reuses the same ID to identify unique clo
 import csv
 import hashlib
 import logging
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor, as_completed
 from dataclasses import dataclass
 from datetime import datetime
 from pathlib import Path
-from typing import Dict, List, Tuple
+from typing import Dict, Iterator, List, Optional, Tuple
 
+from parse_cache import file_stamp, load_cached, store_cached
 from tqdm import tqdm
 
+# Bumped whenever the pickled per-file analysis state changes layout
+ANALYSIS_CACHE_VERSION = 1
 
-@dataclass(frozen=True)
+
+def validate_line_range(start_line: int, end_line: int) -> None:
+    """Validate a code block line range, raising ValueError if it is invalid."""
+    if start_line <= 0 or end_line <= 0:
+        raise ValueError(f"Line numbers must be positive: {start_line}-{end_line}")
+    if start_line > end_line:
+        raise ValueError(f"Start line must be <= end line: {start_line}-{end_line}")
+
+
+@dataclass(slots=True, frozen=True)
 class CodeBlock:
-    """Represents a code block with file path, line range, function name, return type, and parameters."""
+    """Represents a code block with file path, line range, function name, return type, and parameters.
+
+    The line range is validated by the parser (see validate_line_range()), not on
+    construction.
+    """
 
     file_path: str
     start_line: int
@@ -28,53 +47,56 @@ class CodeBlock:
     return_type: str
     parameters: str
 
-    def __post_init__(self):
-        """Validate the code block data."""
-        if self.start_line <= 0 or self.end_line <= 0:
-            raise ValueError(
-                f"Line numbers must be positive: {self.start_line}-{self.end_line}"
-            )
-        if self.start_line > self.end_line:
-            raise ValueError(
-                f"Start line must be <= end line: {self.start_line}-{self.end_line}"
-            )
-
     def __str__(self) -> str:
         return f"{self.file_path}:{self.start_line}-{self.end_line}:{self.function_name}:{self.return_type}:{self.parameters}"
 
 
-@dataclass(frozen=True)
+@dataclass(slots=True, frozen=True)
 class CodeClonePair:
-    """Represents a pair of code blocks that are clones of each other."""
+    """Represents a pair of code blocks that are clones of each other.
+
+    Build pairs with from_blocks() so that the blocks are consistently ordered.
+    """
 
     block1: CodeBlock
     block2: CodeBlock
 
-    def __post_init__(self):
-        """Normalize the pair to ensure consistent ordering."""
-        # Create a normalized version where blocks are ordered consistently
-        if (
-            self.block1.file_path,
-            self.block1.start_line,
-            self.block1.end_line,
-            self.block1.function_name,
-            self.block1.return_type,
-            self.block1.parameters,
-        ) > (
-            self.block2.file_path,
-            self.block2.start_line,
-            self.block2.end_line,
-            self.block2.function_name,
-            self.block2.return_type,
-            self.block2.parameters,
-        ):
+    @classmethod
+    def from_blocks(cls, block1: CodeBlock, block2: CodeBlock) -> "CodeClonePair":
+        """Create a pair with its blocks in a consistent (sorted) order."""
+        # Same order as comparing the full field tuples, but most pairs differ
+        # in file path, so decide on that alone before building any tuples
+        if block1.file_path != block2.file_path:
+            swap = block1.file_path > block2.file_path
+        else:
+            swap = (
+                block1.start_line,
+                block1.end_line,
+                block1.function_name,
+                block1.return_type,
+                block1.parameters,
+            ) > (
+                block2.start_line,
+                block2.end_line,
+                block2.function_name,
+                block2.return_type,
+                block2.parameters,
+            )
+        if swap:
             # Swap blocks to maintain consistent ordering
-            object.__setattr__(self, "block1", self.block2)
-            object.__setattr__(self, "block2", self.block1)
+            block1, block2 = block2, block1
+        return cls(block1, block2)
 
     def get_hash(self) -> str:
         """Generate a unique hash for this pair."""
-        content = f"{self.block1}|{self.block2}"
+        # Same text as f"{block1}|{block2}", built without the two __str__ calls
+        b1, b2 = self.block1, self.block2
+        content = (
+            f"{b1.file_path}:{b1.start_line}-{b1.end_line}:{b1.function_name}:"
+            f"{b1.return_type}:{b1.parameters}|"
+            f"{b2.file_path}:{b2.start_line}-{b2.end_line}:{b2.function_name}:"
+            f"{b2.return_type}:{b2.parameters}"
+        )
         return hashlib.md5(content.encode()).hexdigest()
 
     def __str__(self) -> str:
@@ -84,44 +106,62 @@ class CodeClonePair:
 class UniqueCloneAnalyzer:
     """Analyzes code clone pairs and assigns unique IDs."""
 
-    def __init__(self, log_file: Path = None):
-        self.pair_to_id: Dict[str, int] = {}  # hash -> pair_id
-        self.next_id: int = 1
-        self.processed_pairs: List[
-            Tuple[CodeClonePair, int, bool]
-        ] = []  # pair, id, is_first
+    def __init__(
+        self,
+        log_file: Path = None,
+        cache_dir: Optional[Path] = None,
+        progress: bool = True,
+    ):
+        self.reset()
+        self.cache_dir = cache_dir
+        # Whether save_results() draws its own "Writing results" bar
+        self.progress = progress
 
         # Setup logging
         self.logger = logging.getLogger(__name__)
         self.logger.setLevel(logging.INFO)
 
-        if log_file is None:
-            timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
-            # Create logs directory
-            log_dir = Path(__file__).parent / "logs"
-            log_dir.mkdir(parents=True, exist_ok=True)
-            log_file = log_dir / f"clone_analyzer_{timestamp}.log"
-
-        # Create file handler
-        file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
-        file_handler.setLevel(logging.INFO)
+        # getLogger() returns a shared logger; add handlers only once so that
+        # every analyzer created in this process doesn't duplicate each record
+        if not self.logger.handlers:
+            if log_file is None:
+                timestamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+                # Create logs directory
+                log_dir = Path(__file__).parent / "logs"
+                log_dir.mkdir(parents=True, exist_ok=True)
+                log_file = log_dir / f"clone_analyzer_{timestamp}.log"
+
+            # Create file handler
+            file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
+            file_handler.setLevel(logging.INFO)
+
+            # Create console handler
+            console_handler = logging.StreamHandler()
+            console_handler.setLevel(logging.INFO)
+
+            # Create formatter
+            formatter = logging.Formatter(
+                "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
+            )
+            file_handler.setFormatter(formatter)
+            console_handler.setFormatter(formatter)
 
-        # Create console handler
-        console_handler = logging.StreamHandler()
-        console_handler.setLevel(logging.INFO)
+            # Add handlers to logger
+            self.logger.addHandler(file_handler)
+            self.logger.addHandler(console_handler)
 
-        # Create formatter
-        formatter = logging.Formatter(
-            "%(asctime)s - %(levelname)s - %(message)s", datefmt="%Y-%m-%d %H:%M:%S"
-        )
-        file_handler.setFormatter(formatter)
-        console_handler.setFormatter(formatter)
-
-        # Add handlers to logger
-        self.logger.addHandler(file_handler)
-        self.logger.addHandler(console_handler)
         self.log_file = log_file
 
+    def reset(self) -> None:
+        """Clear the per-file state so the analyzer can be reused for another file."""
+        self.pair_to_id: Dict[CodeClonePair, int] = {}  # pair -> pair_id
+        self.unique_pairs: List[CodeClonePair] = []  # pair_id - 1 -> pair
+        self.pair_hashes: List[str] = []  # pair_id - 1 -> pair hash
+        self.next_id: int = 1
+        self.processed_pairs: List[
+            Tuple[CodeClonePair, int, bool]
+        ] = []  # pair, id, is_first
+
     def parse_csv_line(self, row: List[str]) -> CodeClonePair:
         """Parse a CSV row into a CodeClonePair."""
         # Skip already processed files (15 columns: 12 original + 3 new)
@@ -146,41 +186,55 @@ class UniqueCloneAnalyzer:
                 params2,
             ) = row
 
+            # Validate line ranges; only invalid rows pay for the detailed check
+            start_line1, end_line1 = int(start1.strip()), int(end1.strip())
+            if not 0 < start_line1 <= end_line1:
+                validate_line_range(start_line1, end_line1)
+            start_line2, end_line2 = int(start2.strip()), int(end2.strip())
+            if not 0 < start_line2 <= end_line2:
+                validate_line_range(start_line2, end_line2)
+
+            # Paths and signatures repeat across rows; interning shares one
+            # string per value and makes equal-key dict probes identity checks
             block1 = CodeBlock(
-                file_path=file1.strip(),
-                start_line=int(start1.strip()),
-                end_line=int(end1.strip()),
-                function_name=func1.strip(),
-                return_type=return1.strip(),
-                parameters=params1.strip(),
+                file_path=sys.intern(file1.strip()),
+                start_line=start_line1,
+                end_line=end_line1,
+                function_name=sys.intern(func1.strip()),
+                return_type=sys.intern(return1.strip()),
+                parameters=sys.intern(params1.strip()),
             )
 
             block2 = CodeBlock(
-                file_path=file2.strip(),
-                start_line=int(start2.strip()),
-                end_line=int(end2.strip()),
-                function_name=func2.strip(),
-                return_type=return2.strip(),
-                parameters=params2.strip(),
+                file_path=sys.intern(file2.strip()),
+                start_line=start_line2,
+                end_line=end_line2,
+                function_name=sys.intern(func2.strip()),
+                return_type=sys.intern(return2.strip()),
+                parameters=sys.intern(params2.strip()),
             )
 
-            return CodeClonePair(block1, block2)
+            return CodeClonePair.from_blocks(block1, block2)
 
         except ValueError as e:
             raise ValueError(f"Error parsing row {row}: {e}")
 
     def process_pair(self, pair: CodeClonePair) -> Tuple[int, bool]:
         """Process a code clone pair and return (pair_id, is_first_occurrence)."""
-        pair_hash = pair.get_hash()
-
-        if pair_hash in self.pair_to_id:
+        # The frozen dataclass hashes its fields, so the pair itself is the key
+        pair_id = self.pair_to_id.get(pair)
+        if pair_id is not None:
             # This pair has been seen before
-            pair_id = self.pair_to_id[pair_hash]
             is_first = False
+            # Keep only the first instance alive, so memory grows with the
+            # number of unique pairs rather than with every parsed row
+            pair = self.unique_pairs[pair_id - 1]
         else:
-            # This is a new unique pair
+            # This is a new unique pair; hash it once for the output column
             pair_id = self.next_id
-            self.pair_to_id[pair_hash] = pair_id
+            self.pair_to_id[pair] = pair_id
+            self.unique_pairs.append(pair)
+            self.pair_hashes.append(pair.get_hash())
             self.next_id += 1
             is_first = True
 
@@ -189,38 +243,49 @@ class UniqueCloneAnalyzer:
 
     def split_csv_line(self, line: str) -> List[str]:
         """Split a CSV line, ignoring commas inside square brackets."""
+        pieces = line.split(",")
+        if "[" not in line and "]" not in line:
+            # No brackets, so every comma is a column separator
+            if not pieces[-1]:
+                pieces.pop()
+            return pieces
+
+        # Re-join pieces whose separating comma sits inside brackets; the
+        # bracket depth at a comma is the running "[" minus "]" count before it
         result = []
-        current = []
+        current = None
         bracket_depth = 0
 
-        for char in line:
-            if char == "[":
-                bracket_depth += 1
-                current.append(char)
-            elif char == "]":
-                bracket_depth -= 1
-                current.append(char)
-            elif char == "," and bracket_depth == 0:
-                # This comma is a column separator
-                result.append("".join(current))
-                current = []
+        for piece in pieces:
+            if current is None:
+                current = piece
             else:
-                current.append(char)
+                current = f"{current},{piece}"
+            bracket_depth += piece.count("[") - piece.count("]")
+            if bracket_depth == 0:
+                # The comma after this piece is a column separator
+                result.append(current)
+                current = None
 
         # Add the last field
-        if current:
-            result.append("".join(current))
+        if current is not None:
+            result.append(current)
+        if result and not result[-1]:
+            result.pop()
 
         return result
 
-    def analyze_csv_file(self, csv_file_path: Path) -> None:
-        """Analyze a CSV file containing code clone pairs."""
+    def analyze_csv_file(self, csv_file_path: Path) -> List[str]:
+        """Analyze a CSV file containing code clone pairs.
+
+        Returns the per-line error messages that were logged.
+        """
         if not csv_file_path.exists():
             error_msg = f"CSV file not found: {csv_file_path}"
             self.logger.error(error_msg)
             raise FileNotFoundError(error_msg)
 
-        error_count = 0
+        errors = []
         with open(csv_file_path, "r", encoding="utf-8") as file:
             for line_num, line in enumerate(file, 1):
                 try:
@@ -238,16 +303,18 @@ class UniqueCloneAnalyzer:
                     self.process_pair(pair)
 
                 except ValueError as e:
-                    error_count += 1
-                    self.logger.error(
-                        f"Line {line_num}: Failed to parse row - {str(e)}"
-                    )
+                    errors.append(f"Line {line_num}: Failed to parse row - {str(e)}")
+                    self.logger.error(errors[-1])
                     continue
                 except Exception as e:
-                    error_count += 1
-                    self.logger.error(f"Line {line_num}: Unexpected error - {str(e)}")
+                    errors.append(f"Line {line_num}: Unexpected error - {str(e)}")
+                    self.logger.error(errors[-1])
                     continue
 
+        self._log_error_summary(len(errors))
+        return errors
+
+    def _log_error_summary(self, error_count: int) -> None:
         if error_count > 0:
             self.logger.error(
                 f"Analysis completed with {error_count} errors. "
@@ -255,6 +322,82 @@ class UniqueCloneAnalyzer:
                 f"Unique pairs: {len(self.pair_to_id)}"
             )
 
+    def analyze_csv_file_cached(self, csv_file_path: Path) -> None:
+        """analyze_csv_file() through an on-disk cache keyed by file mtime and size.
+
+        Expects freshly reset state, since a cache hit replaces it wholesale.
+        """
+        if self.cache_dir is None or not csv_file_path.exists():
+            self.analyze_csv_file(csv_file_path)
+            return
+
+        stamp = file_stamp(csv_file_path, ANALYSIS_CACHE_VERSION)
+        # Inputs share names across snapshot dirs (e.g. */clone_pairs.csv),
+        # so key each entry on the resolved path as well as the stem
+        path_key = hashlib.md5(str(csv_file_path.resolve()).encode("utf-8"))
+        cache_path = (
+            self.cache_dir / f"{csv_file_path.stem}_{path_key.hexdigest()[:16]}.pkl"
+        )
+        state = load_cached(cache_path, stamp)
+        if state is not None:
+            (
+                self.unique_pairs,
+                self.pair_hashes,
+                self.processed_pairs,
+                errors,
+            ) = state
+            self.pair_to_id = {
+                pair: pair_id for pair_id, pair in enumerate(self.unique_pairs, 1)
+            }
+            self.next_id = len(self.unique_pairs) + 1
+            # Replay the parse errors so the log matches an uncached run
+            for message in errors:
+                self.logger.error(message)
+            self._log_error_summary(len(errors))
+            return
+
+        errors = self.analyze_csv_file(csv_file_path)
+        state = (self.unique_pairs, self.pair_hashes, self.processed_pairs, errors)
+        error = store_cached(cache_path, stamp, state)
+        if error is not None:
+            self.logger.warning(f"Failed to write analysis cache {cache_path}: {error}")
+
+    def analyze_and_save(self, csv_file_path: Path, output_path: Path) -> None:
+        """Analyze one CSV file from scratch and save its results."""
+        self.reset()
+        self.analyze_csv_file_cached(csv_file_path)
+        self.save_results(output_path)
+
+    def _iter_result_rows(self) -> Iterator[Tuple]:
+        """Yield one output row per processed pair, in input order."""
+        pair_hashes = self.pair_hashes
+        for pair, pair_id, is_first in tqdm(
+            self.processed_pairs,
+            desc="Writing results",
+            mininterval=0.5,
+            smoothing=0,
+            disable=not self.progress,
+        ):
+            block1 = pair.block1
+            block2 = pair.block2
+            yield (
+                block1.file_path,
+                block1.start_line,
+                block1.end_line,
+                block1.function_name,
+                block1.return_type,
+                block1.parameters,
+                block2.file_path,
+                block2.start_line,
+                block2.end_line,
+                block2.function_name,
+                block2.return_type,
+                block2.parameters,
+                pair_id,
+                is_first,
+                pair_hashes[pair_id - 1],
+            )
+
     def save_results(self, output_path: Path) -> None:
         """Save the analysis results to a CSV file."""
         try:
@@ -285,43 +428,42 @@ class UniqueCloneAnalyzer:
                 )
 
                 # Write data
-                for pair, pair_id, is_first in tqdm(
-                    self.processed_pairs, desc="Writing results"
-                ):
-                    writer.writerow(
-                        [
-                            pair.block1.file_path,
-                            pair.block1.start_line,
-                            pair.block1.end_line,
-                            pair.block1.function_name,
-                            pair.block1.return_type,
-                            pair.block1.parameters,
-                            pair.block2.file_path,
-                            pair.block2.start_line,
-                            pair.block2.end_line,
-                            pair.block2.function_name,
-                            pair.block2.return_type,
-                            pair.block2.parameters,
-                            pair_id,
-                            is_first,
-                            pair.get_hash(),
-                        ]
-                    )
+                writer.writerows(self._iter_result_rows())
         except Exception as e:
             error_msg = f"Failed to save results to {output_path}: {str(e)}"
             self.logger.error(error_msg)
             raise IOError(error_msg)
 
 
+# Per-process analyzer, created once by the pool initializer
+_worker_analyzer: Optional[UniqueCloneAnalyzer] = None
+
+
+def _init_analyzer_worker(log_file: Optional[Path], cache_dir: Optional[Path]) -> None:
+    global _worker_analyzer
+    # Per-file bars from concurrent workers would interleave; the parent
+    # process shows the per-file bar instead
+    _worker_analyzer = UniqueCloneAnalyzer(
+        log_file=log_file, cache_dir=cache_dir, progress=False
+    )
+
+
+def _analyze_and_save_in_worker(csv_file_path: Path, output_path: Path) -> None:
+    _worker_analyzer.analyze_and_save(csv_file_path, output_path)
+
+
 def process_all_results_files(
-    input_dir: Path, output_dir: Path = None, log_file: Path = None
+    input_dir: Path,
+    output_dir: Path = None,
+    log_file: Path = None,
+    cache_dir: Optional[Path] = None,
 ) -> None:
     """Process all CSV files in the input directory."""
     # Setup logging for this function
     logger = logging.getLogger("process_all_results_files")
     logger.setLevel(logging.INFO)
 
-    if log_file:
+    if log_file and not logger.handlers:
         file_handler = logging.FileHandler(log_file, mode="a", encoding="utf-8")
         file_handler.setLevel(logging.INFO)
         console_handler = logging.StreamHandler()
@@ -354,24 +496,40 @@ def process_all_results_files(
     if output_dir != input_dir:
         logger.info(f"Output directory: {output_dir}")
 
-    # Process each CSV file
-    for csv_file in tqdm(csv_files, desc="Processing CSV files"):
-        try:
-            # Create analyzer for this file
-            analyzer = UniqueCloneAnalyzer(log_file=log_file)
-
-            # Analyze the CSV file
-            analyzer.analyze_csv_file(csv_file)
-
-            # Determine output path
-            output_path = output_dir / csv_file.name
-
-            # Save results
-            analyzer.save_results(output_path)
-
-        except Exception as e:
-            logger.error(f"Failed to process {csv_file.name}: {str(e)}")
-            continue
+    # Files are independent (pair IDs are assigned per file), so spread them
+    # over worker processes, each reusing one analyzer
+    workers = min(os.cpu_count() or 1, len(csv_files))
+    if workers == 1:
+        # One analyzer (and one set of log handlers) for all files
+        analyzer = UniqueCloneAnalyzer(log_file=log_file, cache_dir=cache_dir)
+
+        # Process each CSV file
+        for csv_file in tqdm(csv_files, desc="Processing CSV files"):
+            try:
+                analyzer.analyze_and_save(csv_file, output_dir / csv_file.name)
+            except Exception as e:
+                logger.error(f"Failed to process {csv_file.name}: {str(e)}")
+                continue
+    else:
+        with ProcessPoolExecutor(
+            max_workers=workers,
+            initializer=_init_analyzer_worker,
+            initargs=(log_file, cache_dir),
+        ) as executor:
+            futures = {
+                executor.submit(
+                    _analyze_and_save_in_worker, csv_file, output_dir / csv_file.name
+                ): csv_file
+                for csv_file in csv_files
+            }
+            for future in tqdm(
+                as_completed(futures), total=len(futures), desc="Processing CSV files"
+            ):
+                csv_file = futures[future]
+                try:
+                    future.result()
+                except Exception as e:
+                    logger.error(f"Failed to process {csv_file.name}: {str(e)}")
 
     logger.info("\nAll files processed successfully!")
 
@@ -402,10 +560,16 @@ def main():
         default="logs/clone_analyzer.log",
         help="Log file path (default: logs/clone_analyzer.log)",
     )
+    parser.add_argument(
+        "--cache-dir",
+        type=str,
+        help="Directory for cached per-file analysis, reused while the CSV files are unchanged (optional)",
+    )
 
     args = parser.parse_args()
 
     log_path = Path(args.log) if args.log else None
+    cache_dir = Path(args.cache_dir) if args.cache_dir else None
 
     # Ensure log directory exists
     if log_path:
@@ -424,7 +588,10 @@ def main():
         output_dir = Path(args.output_dir) if args.output_dir else None
 
         process_all_results_files(
-            input_dir=input_dir, output_dir=output_dir, log_file=log_path
+            input_dir=input_dir,
+            output_dir=output_dir,
+            log_file=log_path,
+            cache_dir=cache_dir,
         )
 
     except Exception as e: